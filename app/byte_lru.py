@@ -0,0 +1,50 @@
+"""
+Size-bounded LRU shared by the in-memory result and chart caches.
+"""
+import threading
+from collections import OrderedDict
+
+
+class ByteLRU:
+    """
+    Thread-safe LRU of bytes values bounded by their total length. A value
+    larger than max_bytes on its own is not stored.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            if key in self.entries:
+                self.current_bytes -= len(self.entries.pop(key))
+            if len(value) > self.max_bytes:
+                return
+            self.entries[key] = value
+            self.current_bytes += len(value)
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
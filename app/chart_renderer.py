@@ -0,0 +1,86 @@
+"""
+Renders charts to image bytes keyed by the data they plot.
+
+Each chart is described by a job: a registered kind plus the hashable content
+it plots, e.g. ("radar", avg_stats, team_index, team_name).
+Rendered bytes are kept in a size-bounded LRU, and a batch of missing charts is
+rendered concurrently in a thread pool. Figures never touch pyplot's global
+registry and are cleared as soon as they are encoded, so nothing accumulates
+across reruns or sessions.
+"""
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from app.byte_lru import ByteLRU
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+RENDER_THREADS = 4
+
+# Chart kind -> function building a matplotlib Figure from the job's content
+_BUILDERS = {}
+_theme_lock = threading.Lock()
+_theme_applied = False
+
+
+def register_chart_kind(kind, builder):
+    _BUILDERS[kind] = builder
+
+
+def ensure_chart_theme():
+    """
+    Imports the plotting stack and applies the global dark theme on first use,
+    before any render thread starts building figures.
+    """
+    global _theme_applied
+    with _theme_lock:
+        if _theme_applied:
+            return
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        sns.set_style(style="darkgrid")  # Set Seaborn theme
+        plt.style.use("dark_background")  # Dark mode styling
+        _theme_applied = True
+
+
+class ChartCache(ByteLRU):
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(max_bytes)
+
+
+CHART_CACHE = ChartCache()
+_executor = ThreadPoolExecutor(max_workers=RENDER_THREADS, thread_name_prefix="chart-render")
+
+
+def _render(job, fmt):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    kind, *args = job
+    fig = _BUILDERS[kind](*args)
+    try:
+        buffer = io.BytesIO()
+        FigureCanvasAgg(fig).print_figure(buffer, format=fmt, bbox_inches="tight", facecolor=fig.get_facecolor())
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+def render_charts(jobs, fmt="png", cache=None):
+    """
+    Returns the rendered bytes for every job, in order. Cached charts are reused;
+    the rest are rendered concurrently as one batch.
+    """
+    cache = cache or CHART_CACHE
+    images = [cache.get((job, fmt)) for job in jobs]
+    missing = [i for i, image in enumerate(images) if image is None]
+    if missing:
+        ensure_chart_theme()
+        rendered = _executor.map(lambda i: _render(jobs[i], fmt), missing)
+        for i, image in zip(missing, rendered):
+            cache.put((jobs[i], fmt), image)
+            images[i] = image
+    return images
+
+
+def render_chart(job, fmt="png", cache=None):
+    return render_charts([job], fmt, cache)[0]
@@ -0,0 +1,317 @@
+"""
+Duplicate-free, seeded sampling of k-subsets through the combinatorial number system.
+
+Every k-subset {c_1 < ... < c_k} of range(n) has a unique rank
+sum(C(c_i, i)) in [0, C(n, k)) (colexicographic order), and unranking is a
+greedy walk over a binomial table. Sampling a team therefore reduces to
+choosing distinct ranks. A keyed Feistel permutation of [0, C(n, k)) maps
+sample number i to a rank, so any slice of samples can be produced on its
+own, in any order or process, with no duplicates and no memory of what was
+drawn before. When C(n, k) fits in the budget every subset is enumerated.
+
+Ranks are int64 while C(n, k) stays below MAX_COMBINATIONS. Larger rank spaces
+(a big pool with k = 6 passes 2 ** 64 near n = 4900) use Python-int ranks: the
+Feistel network works on two uint64 halves of up to 62 bits each, and unranking
+switches back to int64 as soon as the remaining rank fits.
+"""
+from math import comb
+import numpy as np
+
+FEISTEL_ROUNDS = 4
+# Ranks are int64 below this count and Python ints from it on
+MAX_COMBINATIONS = 2 ** 62
+# Each Feistel half is a uint64 holding at most this many bits
+MAX_HALF_BITS = 62
+
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+def binomial_table(n, k):
+    """
+    (n + 1) x (k + 1) table of C(c, i); int64 unless an entry reaches
+    MAX_COMBINATIONS, in which case entries are Python ints.
+    """
+    large = comb(n, min(k, n // 2)) >= MAX_COMBINATIONS
+    table = np.zeros((n + 1, k + 1), dtype=object if large else np.int64)
+    for c in range(n + 1):
+        for i in range(min(c, k) + 1):
+            table[c, i] = comb(c, i)
+    return table
+
+
+def rank_combinations(combos, n):
+    """
+    Colex ranks of the rows of an (m x k) array of subsets of range(n).
+    """
+    combos = np.sort(np.asarray(combos, dtype=np.intp), axis=1)
+    k = combos.shape[1]
+    table = binomial_table(n, k)
+    return table[combos, np.arange(1, k + 1)].sum(axis=1)
+
+
+def unrank_combinations(ranks, n, k, table=None):
+    """
+    Inverse of rank_combinations: an (m x k) array of ascending subsets of range(n).
+    """
+    if table is None:
+        table = binomial_table(n, k)
+    remainder = np.array(ranks, dtype=table.dtype)
+    combos = np.empty((len(remainder), k), dtype=np.intp)
+    # Fill from the largest member down: c_i is the largest c with C(c, i) <= remainder
+    for i in range(k, 0, -1):
+        column = table[:n, i]
+        if remainder.dtype == object and table[n, i] < MAX_COMBINATIONS:
+            # The remainder is below C(n, i) from here on, so the rest runs in int64
+            remainder = remainder.astype(np.int64)
+        if remainder.dtype != object:
+            column = column.astype(np.int64)
+        members = np.searchsorted(column, remainder, side="right") - 1
+        combos[:, i - 1] = members
+        remainder -= column[members]
+    return combos
+
+
+def _mix(values):
+    # splitmix64 finalizer; uint64 arithmetic wraps as intended
+    values = (values ^ (values >> np.uint64(30))) * _MIX_1
+    values = (values ^ (values >> np.uint64(27))) * _MIX_2
+    return values ^ (values >> np.uint64(31))
+
+
+class RankPermutation:
+    """
+    Seeded bijection of range(size), evaluated on arrays of indices.
+
+    A balanced Feistel network permutes the smallest even-bit domain covering
+    size; outputs that land outside range(size) are re-encrypted until they
+    fall inside (cycle walking), which takes fewer than four rounds on average.
+    Values are kept as (high, low) halves, so size may exceed 64 bits. Returns
+    int64 values, or Python ints when size exceeds the int64 range.
+    """
+
+    def __init__(self, size, keys):
+        self.size = int(size)
+        self.half_bits = max(1, ((self.size - 1).bit_length() + 1) // 2)
+        if self.half_bits > MAX_HALF_BITS:
+            raise ValueError(f"{self.size} ranks are too many to permute.")
+        self.mask = np.uint64((1 << self.half_bits) - 1)
+        self.keys = [np.uint64(key) for key in keys]
+        self.size_high, self.size_low = (np.uint64(half) for half in divmod(self.size, 1 << self.half_bits))
+
+    def _encrypt(self, left, right):
+        for key in self.keys:
+            left, right = right, left ^ (_mix(right ^ key) & self.mask)
+        return left, right
+
+    def _outside(self, left, right):
+        return (left > self.size_high) | ((left == self.size_high) & (right >= self.size_low))
+
+    def __call__(self, indices):
+        indices = np.asarray(indices, dtype=np.uint64)
+        shift = np.uint64(self.half_bits)
+        left, right = self._encrypt(indices >> shift, indices & self.mask)
+        outside = np.flatnonzero(self._outside(left, right))
+        while len(outside):
+            left[outside], right[outside] = self._encrypt(left[outside], right[outside])
+            outside = outside[self._outside(left[outside], right[outside])]
+        if self.size <= MAX_COMBINATIONS:
+            return ((left << shift) | right).astype(np.int64)
+        return left.astype(object) * (1 << self.half_bits) + right.astype(object)
+
+
+def _allocate(budget, capacities):
+    """
+    Splits budget across strata without exceeding any capacity: half of it as
+    an equal quota for every non-empty stratum, the rest in proportion to what
+    each stratum can still take (largest remainders first).
+    """
+    open_strata = [s for s, capacity in enumerate(capacities) if capacity > 0]
+    quota = budget // (2 * len(open_strata)) if open_strata else 0
+    allocation = [min(quota, capacity) for capacity in capacities]
+    remaining = budget - sum(allocation)
+    spare = [capacity - granted for capacity, granted in zip(capacities, allocation)]
+    total_spare = sum(spare)
+    if remaining >= total_spare:
+        return np.array(capacities, dtype=np.int64)
+    shares = [divmod(remaining * free, total_spare) for free in spare]
+    allocation = [granted + share for granted, (share, _) in zip(allocation, shares)]
+    leftover = remaining - sum(share for share, _ in shares)
+    for s in sorted(range(len(shares)), key=lambda s: -shares[s][1])[:leftover]:
+        allocation[s] += 1
+    return np.array(allocation, dtype=np.int64)
+
+
+class GroupedSubsets:
+    """
+    Rank space of k-subsets of range(n) holding at most one item per group.
+
+    Subsets are ordered by j, the number of items drawn from groups with more
+    than one member, then by the choice among those groups (one member each),
+    then by the colex rank of the k - j items drawn from single-item groups.
+    Only the few multi-member groups need a per-group unranking step; the
+    singletons use the plain binomial table. As with ungrouped subsets, ranks
+    are Python ints once the counts reach MAX_COMBINATIONS.
+    """
+
+    def __init__(self, groups, k):
+        groups = np.asarray(groups)
+        self.k = int(k)
+        _, inverse, sizes = np.unique(groups, return_inverse=True, return_counts=True)
+        inverse = inverse.ravel()
+        self.singles = np.flatnonzero(sizes[inverse] == 1)
+        multi = np.flatnonzero(sizes > 1)
+        self.members = [np.flatnonzero(inverse == g) for g in multi]
+        self.n_singles = len(self.singles)
+
+        # ways[f][j]: choices of j items from multi-member groups f.. (one per group)
+        n_multi = len(self.members)
+        ways = [[0] * (self.k + 1) for _ in range(n_multi + 1)]
+        ways[n_multi][0] = 1
+        for f in range(n_multi - 1, -1, -1):
+            size = len(self.members[f])
+            for j in range(self.k + 1):
+                ways[f][j] = ways[f + 1][j] + (size * ways[f + 1][j - 1] if j else 0)
+        counts = [ways[0][j] * comb(self.n_singles, self.k - j) for j in range(self.k + 1)]
+        self.total = sum(counts)
+        large = max(self.total, max(map(max, ways))) >= MAX_COMBINATIONS
+        self.dtype = object if large else np.int64
+        self.ways = np.array(ways, dtype=self.dtype)
+        self.offsets = np.array([0] + counts, dtype=self.dtype).cumsum()
+        self.single_ways = np.array([comb(self.n_singles, self.k - j) for j in range(self.k + 1)], dtype=self.dtype)
+        self.table = binomial_table(self.n_singles, self.k)
+
+    def unrank(self, ranks):
+        ranks = np.asarray(ranks, dtype=self.dtype)
+        combos = np.empty((len(ranks), self.k), dtype=np.intp)
+        n_multi = np.searchsorted(self.offsets, ranks, side="right") - 1
+        local = ranks - self.offsets[n_multi]
+        remainder = local // self.single_ways[n_multi]
+        single_ranks = local % self.single_ways[n_multi]
+
+        # Walk the multi-member groups, taking one member where the rank says so
+        pending = n_multi.copy()
+        slot = np.zeros(len(ranks), dtype=np.intp)
+        for f, members in enumerate(self.members):
+            skip = self.ways[f + 1][pending]
+            take = np.flatnonzero((pending > 0) & (remainder >= skip))
+            if len(take) == 0:
+                continue
+            remainder[take] -= skip[take]
+            per_member = self.ways[f + 1][pending[take] - 1]
+            combos[take, slot[take]] = members[(remainder[take] // per_member).astype(np.intp)]
+            remainder[take] %= per_member
+            slot[take] += 1
+            pending[take] -= 1
+
+        for j in np.unique(n_multi):
+            rows = np.flatnonzero(n_multi == j)
+            picks = unrank_combinations(single_ranks[rows], self.n_singles, self.k - j, self.table)
+            combos[rows, j:] = self.singles[picks]
+        return np.sort(combos, axis=1)
+
+
+class CombinationSampler:
+    """
+    Draws distinct k-subsets of range(n), reproducibly from a seed.
+
+    Sample i is defined for every i in range(len(sampler)), and
+    sampler.batch(start, stop) returns samples start..stop-1 as an
+    ((stop - start) x k) array of ascending members, ready for a vectorized
+    scorer. Results depend only on (n, k, budget, seed, strata), never on how
+    the range is split into batches.
+
+    If C(n, k) <= budget the sampler is exhaustive and yields every subset
+    once, in rank order. Otherwise it draws budget distinct subsets.
+
+    groups optionally labels each item with a group (for example an evolution
+    family); only subsets holding at most one item per group are drawn, and the
+    count and enumeration above apply to those subsets alone.
+
+    strata optionally labels each of the n items (for example a primary type).
+    Subsets are then grouped by the stratum of their highest member, so every
+    subset in a stratum's group contains one of its items and groups never
+    overlap. Each non-empty group gets an equal quota of half the budget and
+    the rest is shared in proportion to group size, so every stratum is
+    represented regardless of how its label sorts.
+    """
+
+    def __init__(self, n, k, budget, seed=None, strata=None, groups=None):
+        self.n, self.k = int(n), int(k)
+        if self.k > self.n:
+            raise ValueError(f"Cannot draw {self.k} of {self.n} items.")
+        self.grouped = None
+        if groups is not None:
+            if strata is not None:
+                raise ValueError("strata and groups cannot be combined.")
+            if len(groups) != self.n:
+                raise ValueError("groups must label every item.")
+            self.grouped = GroupedSubsets(groups, self.k)
+            self.total = self.grouped.total
+        else:
+            self.total = comb(self.n, self.k)
+            self.table = binomial_table(self.n, self.k)
+        self.exhaustive = self.total <= budget
+
+        # Each stratum's rank space is a run of colex rank intervals: subsets whose
+        # highest member is c have ranks [C(c, k), C(c + 1, k)). run_starts holds
+        # the local rank where each run begins and rank_starts its global rank
+        dtype = object if self.total >= MAX_COMBINATIONS else np.int64
+        if strata is None or self.k == 0:
+            self.run_starts = [np.zeros(1, dtype=dtype)]
+            self.rank_starts = [np.zeros(1, dtype=dtype)]
+            capacities = [self.total]
+        else:
+            labels = np.asarray(strata)
+            if len(labels) != self.n:
+                raise ValueError("strata must label every item.")
+            _, codes = np.unique(labels, return_inverse=True)
+            self.run_starts, self.rank_starts, capacities = [], [], []
+            for s in range(codes.max() + 1):
+                items = np.flatnonzero(codes == s).tolist()
+                sizes = [comb(c, self.k - 1) for c in items]
+                self.run_starts.append(np.array([0] + sizes[:-1], dtype=dtype).cumsum())
+                self.rank_starts.append(np.array([comb(c, self.k) for c in items], dtype=dtype))
+                capacities.append(sum(sizes))
+        if self.exhaustive:
+            self.allocation = np.array(capacities, dtype=np.int64)
+        else:
+            self.allocation = _allocate(int(budget), capacities)
+        self.sample_starts = np.concatenate([[0], np.cumsum(self.allocation)])
+
+        key_rng = np.random.default_rng(seed)
+        self.permutations = [
+            RankPermutation(capacity, key_rng.integers(0, 2 ** 63, size=FEISTEL_ROUNDS, dtype=np.uint64))
+            for capacity in capacities
+        ]
+
+    def __len__(self):
+        return int(self.sample_starts[-1])
+
+    def ranks(self, start, stop):
+        """
+        Ranks of samples start..stop-1.
+        """
+        indices = np.arange(start, stop, dtype=np.int64)
+        if self.exhaustive:
+            return indices
+        strata = np.searchsorted(self.sample_starts, indices, side="right") - 1
+        ranks = np.empty(len(indices), dtype=object if self.total >= MAX_COMBINATIONS else np.int64)
+        for s in np.unique(strata):
+            rows = np.flatnonzero(strata == s)
+            offsets = self.permutations[s](indices[rows] - self.sample_starts[s])
+            runs = np.searchsorted(self.run_starts[s], offsets, side="right") - 1
+            ranks[rows] = self.rank_starts[s][runs] + (offsets - self.run_starts[s][runs])
+        return ranks
+
+    def batch(self, start, stop):
+        """
+        Samples start..stop-1 as an array of item indices, one ascending row per subset.
+        """
+        if self.grouped is not None:
+            return self.grouped.unrank(self.ranks(start, stop))
+        return unrank_combinations(self.ranks(start, stop), self.n, self.k, self.table)
+
+    def batches(self, batch_size):
+        for start in range(0, len(self), batch_size):
+            yield self.batch(start, min(start + batch_size, len(self)))
@@ -1,12 +1,37 @@
 import json
 import pandas as pd
+from app.dataset_store import DATA_FILE_PATH
+from app.dataset_index import FamilyIndex, PokemonIndex
+from app.stat_index import StatIndex
+from app.instrumentation import phase
 
 def fetch_pokemon_data():
-    with open("data/pokemon_data.json", "r", encoding="utf-8") as f:
-        data = json.load(f)
+    with phase("data_load"):
+        with open(DATA_FILE_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
 
-    df = pd.DataFrame(data)
-    
-    
-    return df
+        df = pd.DataFrame(data)
+        return df
 
+def build_pokemon_index(pokemon_df):
+    # Build once per loaded frame; row positions refer to pokemon_df as passed in
+    with phase("index_build"):
+        return PokemonIndex(pokemon_df)
+
+def build_family_index(pokemon_df):
+    with phase("index_build"):
+        return FamilyIndex(pokemon_df)
+
+def final_evolutions(pokemon_df):
+    """
+    The final-stage rows of pokemon_df, with is_final_evolution recomputed from
+    the family index so every branch of a branching chain counts as final.
+    """
+    families = build_family_index(pokemon_df)
+    pokemon_df = pokemon_df.assign(is_final_evolution=families.is_final)
+    return pokemon_df[families.is_final].reset_index(drop=True)
+
+def build_stat_index(pokemon_df, normalize=True):
+    # Nearest-neighbour index over base stats; row positions refer to pokemon_df as passed in
+    with phase("index_build"):
+        return StatIndex(pokemon_df, normalize=normalize)
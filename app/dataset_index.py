@@ -0,0 +1,113 @@
+import numpy as np
+
+
+class FamilyIndex:
+    """
+    Evolution families of a Pokémon DataFrame. Every row gets an integer family
+    id (families are keyed by the base species of the evolution chain, so Pokémon
+    without a chain form their own family), members maps each id to its rows, and
+    is_final marks the final stage of every branch.
+
+    Final stages come from the evolves_from column when the dataset has it: a row
+    is final when no row of the frame evolves from it, which handles branching
+    chains such as Eevee's. Older datasets fall back to is_final_evolution.
+    """
+
+    def __init__(self, pokemon_df):
+        roots = [
+            (chain[0] if isinstance(chain, list) and chain else name).lower()
+            for name, chain in zip(pokemon_df["name"], pokemon_df["evolution_chain"])
+        ]
+        self.family_of = {}
+        self.ids = np.fromiter(
+            (self.family_of.setdefault(root, len(self.family_of)) for root in roots), dtype=np.int32, count=len(roots)
+        )
+        self.roots = list(self.family_of)
+        order = np.argsort(self.ids, kind="stable")
+        starts = np.searchsorted(self.ids[order], np.arange(len(self.roots) + 1))
+        self.members = {family: order[starts[family]:starts[family + 1]] for family in range(len(self.roots))}
+
+        if "evolves_from" in pokemon_df.columns:
+            parents = {p.lower() for p in pokemon_df["evolves_from"] if isinstance(p, str)}
+            self.is_final = np.array([name.lower() not in parents for name in pokemon_df["name"]], dtype=bool)
+        else:
+            self.is_final = pokemon_df["is_final_evolution"].to_numpy(dtype=bool)
+
+    def family_members(self, name):
+        """
+        Rows of the family a base species (or any Pokémon's chain root) names.
+        """
+        family = self.family_of.get(name.lower())
+        return self.members[family] if family is not None else np.array([], dtype=np.intp)
+
+    def final_members(self, family):
+        rows = self.members[family]
+        return rows[self.is_final[rows]]
+
+
+class PokemonIndex:
+    """
+    Inverted index from game, type, final-evolution status and evolution family to
+    the positional rows of a Pokémon DataFrame. Postings are packed bitsets, so
+    filters combine by bitwise AND instead of rescanning the frame.
+    """
+
+    def __init__(self, pokemon_df):
+        self.n_rows = len(pokemon_df)
+        self.games = self._build_postings(pokemon_df["games"])
+        self.types = self._build_postings(pokemon_df["types"])
+        self.families = self._build_postings(
+            [chain[:1] if chain else [name] for name, chain in zip(pokemon_df["name"], pokemon_df["evolution_chain"])]
+        )
+        self.family = FamilyIndex(pokemon_df)
+        self.final = np.packbits(self.family.is_final)
+        self.all_rows = np.packbits(np.ones(self.n_rows, dtype=bool))
+
+        # Games in first-appearance order, matching the old explode().unique() listing
+        self.game_options = list(self.games)
+
+    def _build_postings(self, list_column):
+        members = {}
+        for row, items in enumerate(list_column):
+            if not isinstance(items, list):
+                continue
+            for item in items:
+                members.setdefault(item.lower(), []).append(row)
+        postings = {}
+        for key, rows in members.items():
+            bits = np.zeros(self.n_rows, dtype=bool)
+            bits[rows] = True
+            postings[key] = np.packbits(bits)
+        return postings
+
+    def _lookup(self, postings, key):
+        bits = postings.get(key.lower())
+        if bits is None:
+            return np.zeros_like(self.all_rows)
+        return bits
+
+    def select_bits(self, game=None, types=None, final_only=False, family=None):
+        """
+        Bitset of rows matching every given filter. types matches Pokémon having
+        any of the listed types; family is the base species of an evolution chain.
+        """
+        bits = self.all_rows
+        if game:
+            bits = bits & self._lookup(self.games, game)
+        if types:
+            any_type = np.zeros_like(self.all_rows)
+            for t in types:
+                any_type = any_type | self._lookup(self.types, t)
+            bits = bits & any_type
+        if final_only:
+            bits = bits & self.final
+        if family:
+            bits = bits & self._lookup(self.families, family)
+        return bits
+
+    def select(self, **filters):
+        """
+        Sorted positional rows matching the filters; see select_bits.
+        """
+        bits = self.select_bits(**filters)
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_rows))
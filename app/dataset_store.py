@@ -0,0 +1,26 @@
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+DATA_FILE_PATH = os.path.join("data", "pokemon_data.json")
+
+
+@contextmanager
+def atomic_directory(out_dir, prefix):
+    """
+    Yields a fresh temporary directory next to out_dir. When the block exits
+    normally it replaces out_dir with a rename; on error it is removed and
+    out_dir is left untouched.
+    """
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=prefix, dir=parent)
+    try:
+        yield tmp_dir
+        if os.path.isdir(out_dir):
+            shutil.rmtree(out_dir)
+        os.replace(tmp_dir, out_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
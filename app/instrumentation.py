@@ -0,0 +1,136 @@
+"""
+Lightweight per-request instrumentation.
+
+Stages wrap their work in `phase("name")` and bump counters with `count("name")`.
+Both are no-ops unless metrics are enabled (POKEMON_METRICS=1 or `enable()`) and
+a `request()` block is active, so they can stay on hot paths in production.
+"""
+import cProfile
+import contextvars
+import io
+import json
+import logging
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger("app.metrics")
+
+_enabled = os.environ.get("POKEMON_METRICS", "") not in ("", "0")
+_current = contextvars.ContextVar("pokemon_request_metrics", default=None)
+_NULL_PHASE = nullcontext()
+
+
+class RequestMetrics:
+    __slots__ = ("name", "started", "phases", "counts")
+
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.counts = {}
+
+    def add_phase(self, name, seconds):
+        total, calls = self.phases.get(name, (0.0, 0))
+        self.phases[name] = (total + seconds, calls + 1)
+
+    def as_dict(self):
+        return {
+            "request": self.name,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "phases": {
+                name: {"ms": round(total * 1000, 3), "calls": calls}
+                for name, (total, calls) in self.phases.items()
+            },
+            "counts": dict(self.counts),
+        }
+
+
+class _Phase:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.add_phase(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = flag
+
+
+def is_enabled():
+    return _enabled
+
+
+@contextmanager
+def request(name):
+    """
+    Collects phases and counts for one unit of work and logs them as a single
+    structured line on exit. Yields the RequestMetrics, or None when disabled.
+    """
+    if not _enabled:
+        yield None
+        return
+    metrics = RequestMetrics(name)
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+        logger.info(json.dumps(metrics.as_dict()))
+
+
+def phase(name):
+    if not _enabled:
+        return _NULL_PHASE
+    metrics = _current.get()
+    if metrics is None:
+        return _NULL_PHASE
+    return _Phase(metrics, name)
+
+
+def count(name, n=1):
+    if not _enabled:
+        return
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.counts[name] = metrics.counts.get(name, 0) + int(n)
+
+
+@contextmanager
+def capture(profile=True, trace_memory=True, top=20):
+    """
+    Optional deep capture around a block: cProfile cumulative stats and/or the
+    tracemalloc peak and top allocation sites. Results land in the yielded dict.
+    """
+    report = {}
+    profiler = cProfile.Profile() if profile else None
+    if trace_memory:
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    try:
+        yield report
+    finally:
+        if profiler:
+            profiler.disable()
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+            report["profile"] = stream.getvalue()
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            report["memory_peak_mb"] = peak / 1024 / 1024
+            report["memory_top"] = [str(stat) for stat in snapshot.statistics("lineno")[:top]]
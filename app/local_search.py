@@ -0,0 +1,234 @@
+"""
+Simulated-annealing team optimizer with incremental swap evaluation.
+
+A team keeps running aggregates for each objective component: the stat sum,
+per-type member counts (coverage is the number of non-zero counts) and per-type
+weak/resist/4x counts. Swapping one non-locked member updates those aggregates
+with the two Pokémon's rows, so a move never re-evaluates the whole team.
+"""
+import heapq
+import math
+import time
+import numpy as np
+
+from app.type_chart import ALL_TYPES
+
+DEFAULT_RESTARTS = 4
+# Temperature falls geometrically from the initial estimate to this fraction of it
+FINAL_TEMPERATURE_RATIO = 1e-3
+
+
+class _SwapScorer:
+    """
+    Objective aggregates for one team, updated per swap. Scores match
+    team_builder.score_team_matrix for the same objective and weights.
+    """
+
+    def __init__(self, pool, members, objective, coverage_weight, weakness_weight):
+        type_weights = {"total_stats": 0, "coverage": 1, "weighted": coverage_weight}
+        if objective not in type_weights:
+            raise ValueError(f"Unknown objective: {objective}")
+        self.stat_weight = 0 if objective == "coverage" else 1
+        self.type_weight = type_weights[objective]
+        self.weakness_weight = weakness_weight
+
+        self.stats = pool["total_stats"].tolist()
+        self.type_bits = [
+            [bit for bit in range(len(ALL_TYPES)) if mask >> bit & 1] for mask in pool["type_masks"].tolist()
+        ]
+        codes = pool["defense_profiles"]
+        self.weak = (codes > 0).astype(np.int16)
+        self.resist = (codes < 0).astype(np.int16)
+        self.quad = (codes == 2).astype(np.int16)
+
+        self.stat_sum = sum(self.stats[m] for m in members)
+        self.type_counts = [0] * len(ALL_TYPES)
+        for m in members:
+            for bit in self.type_bits[m]:
+                self.type_counts[bit] += 1
+        self.covered = sum(1 for c in self.type_counts if c)
+        members = list(members)
+        self.weak_counts = self.weak[members].sum(axis=0)
+        self.resist_counts = self.resist[members].sum(axis=0)
+        self.quad_total = int(self.quad[members].sum())
+        self.penalty = self._penalty(self.weak_counts, self.resist_counts, self.quad_total)
+
+    @staticmethod
+    def _penalty(weak_counts, resist_counts, quad_total):
+        return int(np.maximum(weak_counts - resist_counts, 0).sum()) + quad_total
+
+    def score(self):
+        return (
+            self.stat_weight * self.stat_sum
+            + self.type_weight * self.covered
+            - self.weakness_weight * self.penalty
+        )
+
+    def swap_delta(self, out, into):
+        """
+        Score change for replacing member `out` with `into`, plus the pending state.
+        """
+        stat_delta = self.stats[into] - self.stats[out]
+
+        covered = self.covered
+        touched = {}
+        for bit in self.type_bits[out]:
+            touched[bit] = touched.get(bit, self.type_counts[bit]) - 1
+        for bit in self.type_bits[into]:
+            touched[bit] = touched.get(bit, self.type_counts[bit]) + 1
+        for bit, new_count in touched.items():
+            covered += (new_count > 0) - (self.type_counts[bit] > 0)
+
+        penalty = self.penalty
+        pending_weak = pending_resist = None
+        quad_total = self.quad_total
+        if self.weakness_weight:
+            pending_weak = self.weak_counts - self.weak[out] + self.weak[into]
+            pending_resist = self.resist_counts - self.resist[out] + self.resist[into]
+            quad_total += int(self.quad[into].sum() - self.quad[out].sum())
+            penalty = self._penalty(pending_weak, pending_resist, quad_total)
+
+        delta = (
+            self.stat_weight * stat_delta
+            + self.type_weight * (covered - self.covered)
+            - self.weakness_weight * (penalty - self.penalty)
+        )
+        return delta, (stat_delta, touched, covered, pending_weak, pending_resist, quad_total, penalty)
+
+    def apply(self, pending):
+        stat_delta, touched, covered, pending_weak, pending_resist, quad_total, penalty = pending
+        self.stat_sum += stat_delta
+        for bit, new_count in touched.items():
+            self.type_counts[bit] = new_count
+        self.covered = covered
+        if pending_weak is not None:
+            self.weak_counts, self.resist_counts = pending_weak, pending_resist
+            self.quad_total, self.penalty = quad_total, penalty
+
+
+def anneal_top_teams(
+    pool,
+    pool_positions,
+    locked_positions,
+    num_remaining,
+    top_n,
+    scoring=("total_stats", 100, 0),
+    evaluations=20_000,
+    restarts=DEFAULT_RESTARTS,
+    seed=None,
+    time_budget=None,
+    cancel_event=None,
+    groups=None
+):
+    """
+    Simulated annealing over single-member swaps, restarted from random teams.
+    Spends up to `evaluations` swap evaluations in total, fewer when stopped by
+    time_budget or cancel_event. Returns (results, spent): up to top_n distinct
+    (score, team_positions) pairs, best first, and the evaluations actually spent.
+
+    groups optionally labels each entry of pool_positions (e.g. evolution family);
+    teams then hold at most one candidate per group, and swaps that would bring
+    in a second member of a group already on the team are never evaluated.
+    """
+    objective, coverage_weight, weakness_weight = scoring
+    rng = np.random.default_rng(seed)
+    started = time.monotonic()
+    locked = [int(p) for p in locked_positions]
+    candidates = [int(p) for p in pool_positions]
+    n_candidates = len(candidates)
+    group_of = dict(zip(candidates, np.asarray(groups).tolist())) if groups is not None else None
+
+    best = []  # min-heap of (score, sequence, team key)
+    seen = set()
+    sequence = 0
+
+    def record(score, members):
+        nonlocal sequence
+        key = tuple(locked + sorted(members))
+        if key in seen:
+            return
+        if len(best) < top_n:
+            heapq.heappush(best, (score, -sequence, key))
+        elif score > best[0][0]:
+            seen.discard(heapq.heapreplace(best, (score, -sequence, key))[2])
+        else:
+            return
+        seen.add(key)
+        sequence += 1
+
+    # Split the budget exactly, so an uninterrupted run spends all of it
+    n_restarts = max(1, min(restarts, evaluations))
+    spent = 0
+    stopped = False
+    for restart in range(n_restarts):
+        per_restart = max(1, evaluations // n_restarts + (restart < evaluations % n_restarts))
+        if stopped:
+            break
+        if num_remaining == 0:
+            members = []
+            scorer = _SwapScorer(pool, locked, objective, coverage_weight, weakness_weight)
+            record(scorer.score(), members)
+            break
+
+        if group_of is None:
+            members = [candidates[i] for i in rng.choice(n_candidates, size=num_remaining, replace=False)]
+        else:
+            # First candidate of each group in a random order, so the start is valid
+            members, taken = [], set()
+            for i in rng.permutation(n_candidates).tolist():
+                if group_of[candidates[i]] not in taken:
+                    taken.add(group_of[candidates[i]])
+                    members.append(candidates[i])
+                    if len(members) == num_remaining:
+                        break
+        in_team = set(members)
+        in_groups = {group_of[m] for m in members} if group_of is not None else None
+        scorer = _SwapScorer(pool, locked + members, objective, coverage_weight, weakness_weight)
+        score = scorer.score()
+        record(score, members)
+        if n_candidates == num_remaining:
+            break
+
+        # Draw proposals in bulk; each is (slot to replace, candidate to bring in)
+        slots = rng.integers(0, num_remaining, size=per_restart)
+        incoming = rng.integers(0, n_candidates, size=per_restart)
+        uniforms = rng.random(per_restart)
+
+        # Start hot enough to accept a typical worsening move about half the time
+        sample = [abs(scorer.swap_delta(members[s], candidates[c])[0]) for s, c in zip(slots[:50], incoming[:50])]
+        temperature = max(1e-9, float(np.mean(sample)) / math.log(2)) if sample else 1.0
+        cooling = FINAL_TEMPERATURE_RATIO ** (1 / per_restart)
+
+        for step in range(per_restart):
+            into = candidates[incoming[step]]
+            if into in in_team:
+                temperature *= cooling
+                continue
+            slot = slots[step]
+            out = members[slot]
+            if in_groups is not None and group_of[into] != group_of[out] and group_of[into] in in_groups:
+                temperature *= cooling
+                continue
+            delta, pending = scorer.swap_delta(out, into)
+            if delta >= 0 or uniforms[step] < math.exp(delta / temperature):
+                scorer.apply(pending)
+                members[slot] = into
+                in_team.discard(out)
+                in_team.add(into)
+                if in_groups is not None:
+                    in_groups.discard(group_of[out])
+                    in_groups.add(group_of[into])
+                score += delta
+                if delta > 0:
+                    record(score, members)
+            temperature *= cooling
+
+            if step % 1024 == 0:
+                stopped = (cancel_event is not None and cancel_event.is_set()) or (
+                    time_budget is not None and time.monotonic() - started >= time_budget
+                )
+                if stopped:
+                    break
+        spent += step + 1
+
+    return [(score, np.asarray(key)) for score, _, key in sorted(best, reverse=True)], spent
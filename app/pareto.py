@@ -0,0 +1,174 @@
+"""
+Multi-objective team search that returns the Pareto front instead of a top N.
+
+Candidate teams are sampled in batches, scored into objective vectors
+(see team_metrics.TEAM_OBJECTIVES) and merged into a running non-dominated
+front with a vectorized skyline filter. When the front outgrows max_front_size
+it is thinned by crowding distance, which keeps the extremes of every objective
+and drops the most crowded interior points.
+"""
+import time
+import numpy as np
+
+from app.instrumentation import phase, count
+from app.combination_sampler import CombinationSampler
+from app.team_builder import SAMPLE_CHUNK_SIZE, prepare_search_pool, sample_team_matrix, stratum_labels
+from app.team_metrics import TEAM_OBJECTIVES, team_objective_matrix
+
+# Points screened against the current front per vectorized comparison
+DOMINANCE_BLOCK_SIZE = 2048
+# Best-first seed block used to build a strong front before screening everything else
+SKYLINE_SEED_SIZE = 256
+
+
+def _dominated_by(points, front):
+    """
+    Boolean mask of rows in points dominated by at least one row of front.
+    """
+    dominated = np.zeros(len(points), dtype=bool)
+    if len(front) == 0:
+        return dominated
+    # Compare one objective at a time on 2-D (block x front) grids; reducing over a
+    # tiny trailing objective axis is far slower
+    front_columns = [np.ascontiguousarray(front[:, j]) for j in range(front.shape[1])]
+    for start in range(0, len(points), DOMINANCE_BLOCK_SIZE):
+        block = points[start:start + DOMINANCE_BLOCK_SIZE]
+        geq = np.ones((len(block), len(front)), dtype=bool)
+        gt = np.zeros((len(block), len(front)), dtype=bool)
+        for j, column in enumerate(front_columns):
+            geq &= column[None, :] >= block[:, j, None]
+            gt |= column[None, :] > block[:, j, None]
+        dominated[start:start + DOMINANCE_BLOCK_SIZE] = (geq & gt).any(axis=1)
+    return dominated
+
+
+def pareto_front_indices(points):
+    """
+    Indices of the non-dominated rows of points (maximizing every column).
+    Points are visited best-sum first, so a small seed block usually forms a
+    front that screens out almost everything else in one vectorized pass.
+    """
+    points = np.asarray(points)
+    remaining = np.argsort(-points.sum(axis=1), kind="stable")
+    front = np.empty(0, dtype=np.intp)
+    while len(remaining):
+        seed, remaining = remaining[:SKYLINE_SEED_SIZE], remaining[SKYLINE_SEED_SIZE:]
+        # Seed points against each other and against the front found so far
+        seed = seed[~_dominated_by(points[seed], points[seed])]
+        seed = seed[~_dominated_by(points[seed], points[front])]
+        front = np.concatenate([front[~_dominated_by(points[front], points[seed])], seed])
+        remaining = remaining[~_dominated_by(points[remaining], points[front])]
+    return np.sort(front)
+
+
+def crowding_distance(points):
+    """
+    NSGA-II crowding distance; boundary points of every objective get infinity.
+    """
+    n, d = points.shape
+    distance = np.zeros(n)
+    if n <= 2:
+        return np.full(n, np.inf)
+    for j in range(d):
+        order = np.argsort(points[:, j], kind="stable")
+        column = points[order, j].astype(float)
+        spread = column[-1] - column[0]
+        distance[order[0]] = distance[order[-1]] = np.inf
+        if spread > 0:
+            distance[order[1:-1]] += (column[2:] - column[:-2]) / spread
+    return distance
+
+
+def thin_front(points, max_size):
+    """
+    Indices of at most max_size points, keeping the least crowded ones.
+    """
+    if len(points) <= max_size:
+        return np.arange(len(points))
+    keep = np.argsort(-crowding_distance(points), kind="stable")[:max_size]
+    return np.sort(keep)
+
+
+def iter_pareto_team_candidates(
+    pokemon_df,
+    team_size=6,
+    max_teams=100_000,
+    locked_pokemon=None,
+    seed=None,
+    objectives=TEAM_OBJECTIVES,
+    max_front_size=50,
+    candidate_index=None,
+    candidate_filters=None,
+    time_budget=None,
+    cancel_event=None,
+    stratify_by=None,
+    one_per_family=False
+):
+    """
+    Streams the Pareto front of sampled teams. Each snapshot holds the front's
+    "teams" (row records), their "objectives" (dicts keyed by objective name),
+    and "evaluated", "total" and "done" as in iter_top_team_candidates.
+    """
+    started = time.monotonic()
+    pool, pool_positions, locked_positions, num_remaining = prepare_search_pool(
+        pokemon_df, team_size, locked_pokemon, candidate_index, candidate_filters, one_per_family
+    )
+
+    sampler = CombinationSampler(
+        len(pool_positions), num_remaining, max_teams, seed,
+        stratum_labels(pool, pool_positions, stratify_by),
+        pool.family_ids[pool_positions] if one_per_family else None
+    )
+    total = len(sampler)
+
+    front_teams = np.empty((0, team_size), dtype=np.intp)
+    front_points = np.empty((0, len(objectives)), dtype=np.int64)
+    evaluated = 0
+    for start in range(0, total, SAMPLE_CHUNK_SIZE):
+        stop = min(start + SAMPLE_CHUNK_SIZE, total)
+        n = stop - start
+        with phase("candidate_generation"):
+            teams = sample_team_matrix(sampler, pool_positions, locked_positions, start, stop)
+        with phase("scoring"):
+            points = team_objective_matrix(pool, teams, objectives)
+        evaluated += n
+        count("candidates_evaluated", n)
+
+        with phase("pareto_filter"):
+            # Drop batch points the current front already beats before the full skyline
+            fresh = ~_dominated_by(points, front_points)
+            teams = np.concatenate([front_teams, teams[fresh]])
+            points = np.concatenate([front_points, points[fresh]])
+
+            keep = pareto_front_indices(points)
+            teams, points = teams[keep], points[keep]
+
+            keep = thin_front(points, max_front_size)
+            front_teams, front_points = teams[keep], points[keep]
+
+        done = evaluated == total
+        if cancel_event is not None and cancel_event.is_set():
+            done = True
+        if time_budget is not None and time.monotonic() - started >= time_budget:
+            done = True
+
+        with phase("formatting"):
+            yield {
+                "teams": [pool.records(team) for team in front_teams],
+                "objectives": [dict(zip(objectives, row.tolist())) for row in front_points],
+                "evaluated": evaluated,
+                "total": total,
+                "done": done,
+            }
+        if done:
+            return
+
+
+def generate_pareto_team_candidates(pokemon_df, **params):
+    """
+    Runs iter_pareto_team_candidates to completion and returns the final snapshot.
+    """
+    snapshot = None
+    for snapshot in iter_pareto_team_candidates(pokemon_df, **params):
+        pass
+    return snapshot
@@ -1,8 +1,5 @@
 import numpy as np
-import matplotlib.pyplot as plt
-
-# Dark mode styling
-plt.style.use("dark_background")
+from app.chart_renderer import ensure_chart_theme, register_chart_kind
 
 STAT_CATEGORIES = [
     "hp", "attack", "defense", "special-attack", "special-defense", "speed"
@@ -12,9 +9,22 @@ COLOR_PALETTE = [
     "#ff6384", "#36a2eb", "#cc65fe", "#ffce56", "#4bc0c0"
 ]
 
+def team_average_stats(team_df):
+    # Rounded so equal-looking charts share a cache entry
+    return tuple(round(float(v), 2) for v in team_df[STAT_CATEGORIES].mean().values)
+
 def plot_team_radar_chart(team_df, team_index, team_name="Team"):
-    # Average stats for the team
-    avg_stats = team_df[STAT_CATEGORIES].mean().values
+    ensure_chart_theme()
+    return build_radar_figure(team_average_stats(team_df), team_index, team_name)
+
+def build_radar_figure(avg_stats, team_index, team_name="Team"):
+    """
+    Radar chart of a team's average stats. Built without pyplot, so the figure is
+    not registered globally and can be rendered from worker threads.
+    """
+    # Imported on first use so the app starts without loading Matplotlib
+    from matplotlib.figure import Figure
+
     labels = STAT_CATEGORIES
 
     # Radar chart setup
@@ -22,7 +32,8 @@ def plot_team_radar_chart(team_df, team_index, team_name="Team"):
     stats = np.concatenate((avg_stats, [avg_stats[0]]))
     angles += angles[:1]
 
-    fig, ax = plt.subplots(figsize=(4.5, 4.5), subplot_kw=dict(polar=True))
+    fig = Figure(figsize=(4.5, 4.5))
+    ax = fig.add_subplot(polar=True)
     ax.plot(angles, stats, color=COLOR_PALETTE[team_index % len(COLOR_PALETTE)], linewidth=2)
     ax.fill(angles, stats, color=COLOR_PALETTE[team_index % len(COLOR_PALETTE)], alpha=0.4)
 
@@ -40,3 +51,9 @@ def plot_team_radar_chart(team_df, team_index, team_name="Team"):
     ax.legend([team_name], loc="upper right", bbox_to_anchor=(1.1, 1.1), fontsize=8, labelcolor="white", facecolor="black", edgecolor="white")
 
     return fig
+
+def radar_job(team_df, team_index, team_name="Team"):
+    # Render job for app.chart_renderer, keyed by the plotted averages
+    return ("radar", team_average_stats(team_df), team_index, team_name)
+
+register_chart_kind("radar", build_radar_figure)
@@ -0,0 +1,172 @@
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+import threading
+import pandas as pd
+from app.byte_lru import ByteLRU
+from app.team_builder import generate_top_team_candidates
+
+# Columns that can change a search result; display-only columns are left out of the key
+KEY_COLUMNS = [
+    "id", "name", "types", "hp", "attack", "defense", "special-attack", "special-defense",
+    "speed", "total_stats", "is_final_evolution", "evolution_chain", "evolves_from"
+]
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Search settings that never change the result, so they stay out of the key
+NON_KEY_PARAMS = {"pokemon_df", "progress_callback", "candidate_index", "candidate_filters", "n_workers"}
+# Bump when the search can return different teams for the same parameters,
+# so stale entries in the disk tier are never served
+SEARCH_VERSION = 3
+
+
+def dataset_fingerprint(pokemon_df):
+    """
+    Content hash of a candidate pool. Rows are hashed in order, since sampled
+    searches draw teams by pool position and a reordered pool yields other teams.
+    """
+    columns = [c for c in KEY_COLUMNS if c in pokemon_df.columns]
+    frame = pokemon_df[columns].copy()
+    for column in frame.columns:
+        if frame[column].dtype == object:
+            frame[column] = frame[column].map(repr)
+    row_hashes = pd.util.hash_pandas_object(frame, index=False).to_numpy()
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+
+def team_query_key(pokemon_df, locked_pokemon=None, **params):
+    """
+    Cache key for a team search: pool fingerprint, sorted normalized locked set,
+    and every remaining search parameter (team_size, top_n, mode, seed, ...).
+    """
+    locked = sorted(p.strip().lower() for p in (locked_pokemon or []))
+    canonical = repr((SEARCH_VERSION, dataset_fingerprint(pokemon_df), locked, sorted(params.items())))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class TeamResultCache:
+    """
+    Thread-safe LRU of search results bounded by their pickled size, with an
+    optional on-disk tier that survives restarts.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, disk_dir=None):
+        self.memory = ByteLRU(max_bytes)
+        self.disk_dir = disk_dir
+        self.disk_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key):
+        payload = self.memory.get(key)
+        if payload is not None:
+            return pickle.loads(payload)
+
+        payload = self._read_disk(key)
+        with self.lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self.memory.put(key, payload)
+        return pickle.loads(payload)
+
+    def put(self, key, value):
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        self.memory.put(key, payload)
+        self._write_disk(key, payload)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "hits": self.memory.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self.memory),
+                "bytes": self.memory.current_bytes,
+            }
+
+    def clear(self):
+        self.memory.clear()
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pkl")
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key, payload):
+        if not self.disk_dir:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, self._disk_path(key))
+
+
+# Process-wide cache; set POKEMON_RESULT_CACHE_DIR to keep results across restarts
+TEAM_RESULT_CACHE = TeamResultCache(disk_dir=os.environ.get("POKEMON_RESULT_CACHE_DIR"))
+
+
+def cached_generate_top_team_candidates(pokemon_df, cache=None, **params):
+    """
+    generate_top_team_candidates behind the result cache. progress_callback is
+    not part of the key and is only called on a miss.
+    """
+    cache = cache or TEAM_RESULT_CACHE
+    progress_callback = params.pop("progress_callback", None)
+
+    # Key on the narrowed pool itself, in the index's row order, rather than on the index object
+    candidate_index = params.pop("candidate_index", None)
+    candidate_filters = params.pop("candidate_filters", None)
+    candidate_df = pokemon_df
+    if candidate_index is not None:
+        candidate_df = pokemon_df.iloc[candidate_index.select(**(candidate_filters or {}))]
+
+    # Fill in defaults so a parameter passed at its default value keys like an omitted one;
+    # results are deterministic across worker counts, so n_workers stays out of the key
+    key_params = {
+        name: parameter.default
+        for name, parameter in inspect.signature(generate_top_team_candidates).parameters.items()
+        if parameter.default is not inspect.Parameter.empty and name not in NON_KEY_PARAMS
+    }
+    key_params.update((k, v) for k, v in params.items() if k not in NON_KEY_PARAMS)
+    key = team_query_key(candidate_df, **key_params)
+
+    teams = cache.get(key)
+    if teams is None:
+        # Search through the index so the packed pool for this filter is reused
+        teams = generate_top_team_candidates(
+            pokemon_df, progress_callback=progress_callback, candidate_index=candidate_index,
+            candidate_filters=candidate_filters, **params
+        )
+        cache.put(key, teams)
+    elif progress_callback:
+        progress_callback(1.0)
+    return teams
+
+
+def prewarm_team_cache(pokemon_df, pokemon_index, games=None, cache=None, **params):
+    """
+    Fills the cache with the no-lock query for every game (or the given games),
+    e.g. at deploy time. Returns the number of queries computed. Pass the same
+    frame, index and search parameters the app searches with (for the web UI, a
+    SharedDataset's frame and index), or the entries will never be looked up.
+    """
+    cache = cache or TEAM_RESULT_CACHE
+    misses_before = cache.stats()["misses"]
+    for game in games or pokemon_index.game_options:
+        cached_generate_top_team_candidates(
+            pokemon_df, cache=cache, candidate_index=pokemon_index,
+            candidate_filters={"game": game, "final_only": True}, **params
+        )
+    return cache.stats()["misses"] - misses_before
@@ -0,0 +1,204 @@
+"""
+Headless bulk team generation.
+
+    python app/scripts/batch_generate.py --grid --output data/team_batch.jsonl
+    python app/scripts/batch_generate.py --jobs queries.jsonl --output results.jsonl --workers 8
+
+A job file holds one JSON query per line, e.g.
+    {"game": "platinum", "locked": ["infernape"], "team_size": 6}
+Missing fields fall back to the command-line defaults. --grid instead builds
+every game x (no lock + each available starter) x --team-sizes.
+
+search_mode "pareto" returns the sampled Pareto front over the team objectives
+instead of a top N: each result holds "objectives" rather than "scores", the
+front is thinned to at most top_n teams and objective is ignored.
+
+Results are appended to --output as JSONL the moment each job finishes, with a
+bounded number of jobs in flight. Rerunning with the same output skips jobs
+whose job_id is already there, so an interrupted batch picks up where it stopped.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.data_loader import fetch_pokemon_data, final_evolutions, build_pokemon_index
+from app.pareto import generate_pareto_team_candidates
+from app.team_builder import iter_top_team_candidates
+
+# Final-stage starters through generation five
+STARTER_FINALS = [
+    "venusaur", "charizard", "blastoise",
+    "meganium", "typhlosion", "feraligatr",
+    "sceptile", "blaziken", "swampert",
+    "torterra", "infernape", "empoleon",
+    "serperior", "emboar", "samurott",
+]
+QUERY_FIELDS = ["game", "locked", "team_size", "top_n", "search_mode", "objective", "max_teams", "seed"]
+
+# Per-worker dataset, loaded once by the pool initializer
+_worker_data = None
+
+
+def job_id(query):
+    canonical = json.dumps({field: query.get(field) for field in QUERY_FIELDS}, sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def load_dataset():
+    pokemon_df = fetch_pokemon_data()
+    pokemon_df = final_evolutions(pokemon_df)
+    pokemon_df["games"] = pokemon_df["games"].apply(lambda x: x if isinstance(x, list) else [])
+    return pokemon_df, build_pokemon_index(pokemon_df)
+
+
+def _init_worker():
+    global _worker_data
+    _worker_data = load_dataset()
+
+
+def run_job(query):
+    pokemon_df, pokemon_index = _worker_data
+    started = time.perf_counter()
+    result = {"job_id": query["job_id"], "query": {field: query.get(field) for field in QUERY_FIELDS}}
+    try:
+        search = dict(
+            team_size=query["team_size"],
+            max_teams=query["max_teams"],
+            locked_pokemon=query["locked"],
+            seed=query["seed"],
+            candidate_index=pokemon_index,
+            candidate_filters={"game": query["game"], "final_only": True},
+        )
+        if query["search_mode"] == "pareto":
+            snapshot = generate_pareto_team_candidates(pokemon_df, max_front_size=query["top_n"], **search)
+        else:
+            snapshot = None
+            for snapshot in iter_top_team_candidates(
+                pokemon_df, top_n=query["top_n"], search_mode=query["search_mode"], objective=query["objective"],
+                **search
+            ):
+                pass
+        result["teams"] = [[p["name"] for p in team] for team in snapshot["teams"]] if snapshot else []
+        if query["search_mode"] == "pareto":
+            result["objectives"] = snapshot["objectives"] if snapshot else []
+        else:
+            result["scores"] = [float(s) for s in snapshot["scores"]] if snapshot else []
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+
+def read_job_file(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def grid_jobs(pokemon_df, pokemon_index, games, team_sizes):
+    names = set(pokemon_df["name"])
+    for game in games or pokemon_index.game_options:
+        game_names = set(pokemon_df["name"].iloc[pokemon_index.select(game=game, final_only=True)])
+        locks = [[]] + [[starter] for starter in STARTER_FINALS if starter in names and starter in game_names]
+        for team_size in team_sizes:
+            for locked in locks:
+                yield {"game": game, "locked": locked, "team_size": team_size}
+
+
+def completed_job_ids(path):
+    done = set()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["job_id"])
+                except (ValueError, KeyError):
+                    # A torn last line from an interrupted run is simply redone
+                    continue
+    except OSError:
+        pass
+    return done
+
+
+def run_batch(queries, output_path, workers=None, max_pending=None):
+    """
+    Runs queries across a process pool and appends each result to output_path.
+    Returns (written, skipped).
+    """
+    done = completed_job_ids(output_path)
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 4
+    written = skipped = 0
+
+    with open(output_path, "a", encoding="utf-8") as out, ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker
+    ) as executor:
+        pending = set()
+        for query in queries:
+            if query["job_id"] in done:
+                skipped += 1
+                continue
+            done.add(query["job_id"])
+            # Keep only a bounded window of jobs in flight
+            if len(pending) >= max_pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    out.write(json.dumps(future.result()) + "\n")
+                    written += 1
+                out.flush()
+            pending.add(executor.submit(run_job, query))
+        for future in wait(pending).done:
+            out.write(json.dumps(future.result()) + "\n")
+            written += 1
+        out.flush()
+    return written, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--jobs", help="JSONL file with one query per line")
+    source.add_argument("--grid", action="store_true", help="Every game x starter lock x team size")
+    parser.add_argument("--output", required=True, help="JSONL file results are appended to")
+    parser.add_argument("--games", nargs="+", help="Restrict --grid to these games")
+    parser.add_argument("--team-sizes", type=int, nargs="+", default=[6])
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument("--search-mode", default="exact", choices=["exact", "sample", "anneal", "pareto"])
+    parser.add_argument("--objective", default="total_stats", choices=["total_stats", "coverage", "weighted"])
+    parser.add_argument("--max-teams", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.jobs:
+        raw_queries = read_job_file(args.jobs)
+    else:
+        pokemon_df, pokemon_index = load_dataset()
+        raw_queries = grid_jobs(pokemon_df, pokemon_index, args.games, args.team_sizes)
+
+    defaults = {
+        "locked": [], "team_size": args.team_sizes[0], "top_n": args.top_n, "search_mode": args.search_mode,
+        "objective": args.objective, "max_teams": args.max_teams, "seed": args.seed,
+    }
+
+    def queries():
+        for raw in raw_queries:
+            query = {**defaults, **raw}
+            query["locked"] = sorted(name.strip().lower() for name in query["locked"])
+            query["job_id"] = job_id(query)
+            yield query
+
+    started = time.perf_counter()
+    written, skipped = run_batch(queries(), args.output, args.workers)
+    print(f"✅ {written} jobs written, {skipped} already done, in {time.perf_counter() - started:.1f}s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,204 @@
 import os
+import sys
 import json
 import time
-import requests
+import random
+import asyncio
+import httpx
 from tqdm import tqdm
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from app.sprite_store import SPRITE_DIR_PATH, build_sprite_bundle, sprite_path
+
 API_BASE_URL = "https://pokeapi.co/api/v2"
 DATA_FILE_PATH = os.path.join("data", "pokemon_data.json")
+CHECKPOINT_PATH = os.path.join("data", "pokemon_data.checkpoint.jsonl")
+VALIDATORS_PATH = os.path.join("data", "pokemon_data.validators.json")
+
+# A record missing any of these, or with an empty evolution chain, is refetched
+REQUIRED_FIELDS = {
+    "id", "name", "types", "hp", "attack", "defense", "special-attack", "special-defense",
+    "speed", "total_stats", "sprite_url", "games", "evolution_chain", "evolves_from", "is_final_evolution"
+}
+
+# Politeness and resilience settings for the PokéAPI
+MAX_CONCURRENCY = 10
+REQUESTS_PER_SECOND = 20
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 0.5
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter: `rate` tokens per second, bursting to `capacity`.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
 
-def fetch_all_pokemon(limit=492):  # You can increase this limit if desired
-    response = requests.get(f"{API_BASE_URL}/pokemon?limit={limit}")
-    response.raise_for_status()
-    return response.json()["results"]
 
-def get_evolution_chain(url):
-    response = requests.get(url)
-    response.raise_for_status()
-    species_data = response.json()
+def response_validators(response):
+    return {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
 
+
+class PokeApiClient:
+    """
+    Pooled httpx client with a concurrency cap, rate limiting and retry with backoff.
+    Responses are memoized per run, so each URL is fetched at most once even when
+    several Pokémon ask for the same species or evolution chain concurrently.
+    The ETag/Last-Modified of every JSON response are kept in self.validators.
+    """
+
+    def __init__(self, concurrency=MAX_CONCURRENCY, rate=REQUESTS_PER_SECOND, max_retries=MAX_RETRIES, timeout=30.0):
+        self.http = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+        )
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.bucket = TokenBucket(rate)
+        self.max_retries = max_retries
+        self.memo = {}
+        self.validators = {}
+        self.requests_made = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.http.aclose()
+
+    async def get_json(self, url):
+        task = self.memo.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(url))
+            self.memo[url] = task
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            # Let a later caller retry a URL whose fetch failed
+            if self.memo.get(url) is task:
+                del self.memo[url]
+            raise
+
+    async def get_bytes(self, url):
+        """
+        Raw response body, memoized per run like get_json.
+        """
+        key = ("bytes", url)
+        task = self.memo.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._request(url))
+            self.memo[key] = task
+        try:
+            return (await asyncio.shield(task)).content
+        except Exception:
+            if self.memo.get(key) is task:
+                del self.memo[key]
+            raise
+
+    async def get_json_if_changed(self, url, validators=None):
+        """
+        Conditional GET: returns (None, validators) when the server answers 304,
+        otherwise (json, new_validators) from the ETag/Last-Modified headers.
+        """
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+        response = await self._request(url, headers)
+        if response.status_code == 304:
+            return None, validators
+        return response.json(), response_validators(response)
+
+    async def changed(self, url, validators):
+        """
+        Whether url changed since validators[url] was recorded, checked once per
+        run. validators is updated in place, and a changed body is memoized so a
+        following get_json(url) costs no request.
+        """
+        key = ("changed", url)
+        task = self.memo.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._check(url, validators))
+            self.memo[key] = task
+        try:
+            return await asyncio.shield(task)
+        except Exception:
+            if self.memo.get(key) is task:
+                del self.memo[key]
+            raise
+
+    async def _check(self, url, validators):
+        data, validators[url] = await self.get_json_if_changed(url, validators.get(url))
+        if data is None:
+            return False
+        self.validators[url] = validators[url]
+        fetched = asyncio.get_running_loop().create_future()
+        fetched.set_result(data)
+        self.memo[url] = fetched
+        return True
+
+    async def _fetch(self, url):
+        response = await self._request(url)
+        self.validators[url] = response_validators(response)
+        return response.json()
+
+    async def _request(self, url, headers=None):
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            async with self.semaphore:
+                self.requests_made += 1
+                try:
+                    response = await self.http.get(url, headers=headers)
+                except httpx.TransportError:
+                    if attempt == self.max_retries:
+                        raise
+                    response = None
+            if response is not None:
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                    if response.status_code != 304:
+                        response.raise_for_status()
+                    return response
+            await asyncio.sleep(self._backoff(attempt, response))
+
+    def _backoff(self, attempt, response):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return BACKOFF_SECONDS * 2 ** attempt * (1 + random.random())
+
+
+async def fetch_all_pokemon(client, limit=492, api_base_url=API_BASE_URL):  # You can increase this limit if desired
+    data = await client.get_json(f"{api_base_url}/pokemon?limit={limit}")
+    return data["results"]
+
+async def get_evolution_chain(client, species_data):
+    """
+    Returns (all evolutions in order, names of the final stage of every branch).
+    """
     evolution_chain_url = species_data["evolution_chain"]["url"]
-    response = requests.get(evolution_chain_url)
-    response.raise_for_status()
-    evolution_chain = response.json()["chain"]
+    evolution_chain = (await client.get_json(evolution_chain_url))["chain"]
 
-    return flatten_evolution_chain(evolution_chain)
+    return flatten_evolution_chain(evolution_chain), final_evolutions(evolution_chain)
 
 def flatten_evolution_chain(chain):
     """
@@ -38,10 +214,19 @@ def flatten_evolution_chain(chain):
 
     return evo_list
 
-def fetch_pokemon_details(url):
-    response = requests.get(url)
-    response.raise_for_status()
-    data = response.json()
+def final_evolutions(chain):
+    """
+    Names of the chain's leaves, so every branch of a branching chain (Eevee,
+    Oddish, Wurmple...) has its own final stage.
+    """
+    evolves_to = chain.get("evolves_to", [])
+    if not evolves_to:
+        return [chain["species"]["name"]]
+    return [name for evo in evolves_to for name in final_evolutions(evo)]
+
+async def fetch_pokemon_details(client, url, data=None):
+    if data is None:
+        data = await client.get_json(url)
 
     stats = {stat['stat']['name']: stat['base_stat'] for stat in data['stats']}
     total_stats = sum(stats.values())
@@ -50,19 +235,17 @@ def fetch_pokemon_details(url):
     game_indices = data.get("game_indices", [])
     games = [game["version"]["name"] for game in game_indices]
 
-    # Get species info to later get evolution chain
-    species_url = data["species"]["url"]
-    species_response = requests.get(species_url)
-    species_response.raise_for_status()
-    species_data = species_response.json()
-
-    # Evolution data
+    # Evolution data, via the species record shared by the whole family
     try:
-        evolution_names = get_evolution_chain(species_url)
-        is_final = (data["name"] == evolution_names[-1])
+        species_data = await client.get_json(data["species"]["url"])
+        evolution_names, final_names = await get_evolution_chain(client, species_data)
+        # Chains name species; forms such as wormadam-plant share their species' place
+        is_final = species_data.get("name", data["name"]) in final_names
+        evolves_from = (species_data.get("evolves_from_species") or {}).get("name")
     except Exception as e:
         print(f"Failed to get evolution chain for {data['name']}: {e}")
         evolution_names = []
+        evolves_from = None
         is_final = False
 
     return {
@@ -79,29 +262,223 @@ def fetch_pokemon_details(url):
         "sprite_url": data.get("sprites", {}).get("front_default", None),
         "games": games,
         "evolution_chain": evolution_names,
+        "evolves_from": evolves_from,
         "is_final_evolution": is_final
     }
 
-def cache_data():
-    os.makedirs("data", exist_ok=True)
+async def dependency_urls(client, data):
+    """
+    The species and evolution chain URLs a Pokémon's record is built from.
+    """
+    species_url = data["species"]["url"]
+    species_data = await client.get_json(species_url)
+    return [species_url, species_data["evolution_chain"]["url"]]
+
+async def record_changed(client, url, validators):
+    """
+    Whether the Pokémon at url, its species or its evolution chain changed since
+    the record was fetched. Records without known dependencies count as changed.
+    """
+    if await client.changed(url, validators):
+        return True
+    dependencies = validators.get(url, {}).get("depends_on")
+    if dependencies is None:
+        return True
+    for dependency in dependencies:
+        if await client.changed(dependency, validators):
+            return True
+    return False
+
+def pokemon_id_from_url(url):
+    return int(url.rstrip("/").rsplit("/", 1)[-1])
+
+def is_complete(record):
+    return REQUIRED_FIELDS <= record.keys() and bool(record["evolution_chain"])
+
+def load_existing_records(path=DATA_FILE_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return {record["id"]: record for record in json.load(f)}
+    except (OSError, ValueError):
+        return {}
+
+def load_checkpoint(path=CHECKPOINT_PATH):
+    """
+    Reads records appended by an interrupted run. A torn final line is ignored.
+    """
+    records = {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                records[record["id"]] = record
+    except OSError:
+        pass
+    return records
+
+def load_validators(path=VALIDATORS_PATH):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_bytes_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def write_json_atomic(path, data, **dump_kwargs):
+    # Write beside the target and rename, so readers never see a partial file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+async def fetch_all_details(
+    limit=492,
+    api_base_url=API_BASE_URL,
+    concurrency=MAX_CONCURRENCY,
+    rate=REQUESTS_PER_SECOND,
+    known_records=None,
+    checkpoint_path=None,
+    validators=None,
+    revalidate=False
+):
+    """
+    Fetches every Pokémon's details concurrently and returns them sorted by id.
+
+    Complete entries in known_records are reused without a request, or, with
+    revalidate=True, confirmed through conditional GETs of the Pokémon, its
+    species and its evolution chain and only refetched when one changed. Every
+    record is appended to checkpoint_path as soon as it arrives. validators
+    (url -> ETag/Last-Modified, plus "depends_on" for Pokémon URLs) is updated
+    in place.
+    """
+    known_records = known_records or {}
+    validators = validators if validators is not None else {}
+
+    async with PokeApiClient(concurrency=concurrency, rate=rate) as client:
+        print("Fetching Pokémon list...")
+        pokemon_list = await fetch_all_pokemon(client, limit, api_base_url)
+
+        print("Fetching detailed data for each Pokémon...")
+        checkpoint = open(checkpoint_path, "a", encoding="utf-8") if checkpoint_path else None
 
-    print("Fetching Pokémon list...")
-    pokemon_list = fetch_all_pokemon()
+        async def fetch_one(pokemon):
+            url = pokemon["url"]
+            known = known_records.get(pokemon_id_from_url(url))
+            try:
+                if known is not None and is_complete(known):
+                    if not revalidate:
+                        return known, False
+                    if not await record_changed(client, url, validators):
+                        return known, True
+                data = await client.get_json(url)
+                details = await fetch_pokemon_details(client, url, data)
+                validators[url] = dict(client.validators[url])
+                if details["evolution_chain"]:
+                    validators[url]["depends_on"] = await dependency_urls(client, data)
+                    for dependency in validators[url]["depends_on"]:
+                        validators[dependency] = client.validators[dependency]
+                return details, True
+            except Exception as e:
+                print(f"Failed to fetch {pokemon['name']}: {e}")
+                return known, False
 
-    print("Fetching detailed data for each Pokémon...")
-    all_data = []
-    for pokemon in tqdm(pokemon_list):
+        all_data = []
         try:
-            details = fetch_pokemon_details(pokemon["url"])
-            all_data.append(details)
-            time.sleep(0.2)  # Be nice to the API
-        except Exception as e:
-            print(f"Failed to fetch {pokemon['name']}: {e}")
+            tasks = [asyncio.ensure_future(fetch_one(pokemon)) for pokemon in pokemon_list]
+            for task in tqdm(asyncio.as_completed(tasks), total=len(tasks)):
+                details, checked = await task
+                if details is None:
+                    continue
+                all_data.append(details)
+                if checkpoint and checked:
+                    checkpoint.write(json.dumps(details) + "\n")
+                    checkpoint.flush()
+        finally:
+            if checkpoint:
+                checkpoint.close()
+
+    all_data.sort(key=lambda details: details["id"])
+    return all_data
+
+async def fetch_all_sprites(
+    records,
+    sprite_dir=SPRITE_DIR_PATH,
+    concurrency=MAX_CONCURRENCY,
+    rate=REQUESTS_PER_SECOND
+):
+    """
+    Downloads each distinct sprite URL once into sprite_dir. Sprites already on
+    disk from an earlier or interrupted run are skipped, and each file is written
+    atomically so a partial download is never mistaken for a finished one.
+    Returns the URLs that are available locally.
+    """
+    os.makedirs(sprite_dir, exist_ok=True)
+    urls = sorted({record["sprite_url"] for record in records if record.get("sprite_url")})
+    missing = [url for url in urls if not os.path.exists(sprite_path(url, sprite_dir))]
+    if not missing:
+        return urls
+
+    print(f"Fetching {len(missing)} sprites...")
+    async with PokeApiClient(concurrency=concurrency, rate=rate) as client:
+        async def fetch_one(url):
+            try:
+                write_bytes_atomic(sprite_path(url, sprite_dir), await client.get_bytes(url))
+            except Exception as e:
+                print(f"Failed to fetch sprite {url}: {e}")
 
-    with open(DATA_FILE_PATH, "w", encoding="utf-8") as f:
-        json.dump(all_data, f, indent=2)
+        tasks = [asyncio.ensure_future(fetch_one(url)) for url in missing]
+        for task in tqdm(asyncio.as_completed(tasks), total=len(tasks)):
+            await task
+    return [url for url in urls if os.path.exists(sprite_path(url, sprite_dir))]
+
+def cache_sprites(records, sprite_dir=SPRITE_DIR_PATH):
+    urls = asyncio.run(fetch_all_sprites(records, sprite_dir))
+    bundle_path = build_sprite_bundle(urls, sprite_dir)
+    print(f"✅ {len(urls)} sprites bundled to {bundle_path}")
+
+def cache_data(limit=492, api_base_url=API_BASE_URL, incremental=True, revalidate=False, sprites=True):
+    """
+    Refreshes the dataset. In incremental mode complete entries from the existing
+    dataset and from an interrupted run's checkpoint are kept; revalidate=True
+    additionally checks them against the API with conditional requests.
+    """
+    os.makedirs("data", exist_ok=True)
+
+    known_records = {}
+    validators = {}
+    if incremental:
+        known_records = load_existing_records()
+        validators = load_validators()
+    # Checkpointed records are newer than the dataset they were fetched to replace
+    known_records.update(load_checkpoint())
+
+    all_data = asyncio.run(fetch_all_details(
+        limit,
+        api_base_url,
+        known_records=known_records,
+        checkpoint_path=CHECKPOINT_PATH,
+        validators=validators,
+        revalidate=revalidate
+    ))
+
+    write_json_atomic(DATA_FILE_PATH, all_data, indent=2)
+    write_json_atomic(VALIDATORS_PATH, validators)
+    os.remove(CHECKPOINT_PATH)
 
     print(f"✅ Pokémon data cached to {DATA_FILE_PATH}")
 
+    if sprites:
+        cache_sprites(all_data)
+
 if __name__ == "__main__":
-    cache_data()
+    cache_data(revalidate="--revalidate" in sys.argv[1:], sprites="--skip-sprites" not in sys.argv[1:])
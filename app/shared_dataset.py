@@ -0,0 +1,84 @@
+"""
+Process-wide, read-only Pokémon dataset for the web UI.
+
+The final-evolution frame is loaded once per server process, with every display
+column (title-cased name, type labels, dropdown label) computed in one pass.
+Filtered views are cached per filter key, so a rerun only looks up a view and
+never copies or rewrites the frame. Nothing here may be mutated after
+construction; sessions keep only their own selections.
+"""
+import threading
+from app.data_loader import fetch_pokemon_data, final_evolutions, build_pokemon_index, build_stat_index
+from app.type_icons import TYPE_EMOJIS
+
+
+def format_types(types):
+    return " | ".join(f"{TYPE_EMOJIS.get(t.lower(), '')} {t.title()}" for t in types)
+
+
+def type_icons(types):
+    return " ".join(TYPE_EMOJIS.get(t.lower(), t.title()) for t in types)
+
+
+class DatasetView:
+    """
+    One filter's rows of a SharedDataset: the row positions, the matching frame
+    sorted by name, and its dropdown labels in that order.
+    """
+
+    __slots__ = ("filters", "rows", "frame", "options")
+
+    def __init__(self, dataset, filters):
+        self.filters = filters
+        self.rows = dataset.index.select(**filters)
+        self.frame = dataset.frame.iloc[self.rows].sort_values(by="name")
+        self.options = self.frame["display_name"].tolist()
+
+    @property
+    def empty(self):
+        return len(self.rows) == 0
+
+
+class SharedDataset:
+    """
+    Immutable final-evolution frame with precomputed display columns, its
+    PokemonIndex and StatIndex, and maps between Pokémon names and dropdown labels.
+    """
+
+    def __init__(self, pokemon_df):
+        pokemon_df = final_evolutions(pokemon_df)
+        games = pokemon_df["games"].map(lambda x: x if isinstance(x, list) else [])
+        names = pokemon_df["name"].str.title()
+        types = pokemon_df["types"]
+        display_names = [
+            f"{type_icons(t)} {'◯ ' if len(t) == 1 else ''} {name}" for name, t in zip(names, types)
+        ]
+        # Build a fresh frame rather than assigning into the loaded one
+        self.frame = pokemon_df.assign(
+            games=games, name=names, types_display=types.map(format_types), display_name=display_names
+        )
+        self.index = build_pokemon_index(self.frame)
+        self.stat_index = build_stat_index(self.frame)
+        self.game_options = [game.title() for game in self.index.game_options]
+        self.display_to_name = dict(zip(self.frame["display_name"], self.frame["name"]))
+        self.name_to_display = dict(zip(self.frame["name"], self.frame["display_name"]))
+        self._views = {}
+        self._lock = threading.Lock()
+
+    def view(self, game=None, final_only=False):
+        """
+        Cached DatasetView for a filter; the same filter returns the same object.
+        """
+        filters = {"game": game, "final_only": final_only}
+        key = (game.lower() if game else None, bool(final_only))
+        with self._lock:
+            view = self._views.get(key)
+        if view is None:
+            view = DatasetView(self, filters)
+            with self._lock:
+                view = self._views.setdefault(key, view)
+        return view
+
+
+def load_shared_dataset():
+    return SharedDataset(fetch_pokemon_data())
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+
+from app.dataset_store import atomic_directory
+
+SPRITE_DIR_PATH = os.path.join("data", "sprites")
+SPRITE_BUNDLE_PATH = os.path.join("data", "pokemon_sprites.bundle")
+BUNDLE_FORMAT_VERSION = 1
+
+
+def sprite_file_name(url):
+    # Distinct URLs can share a basename (front/back/shiny variants), so name files by hash
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:20] + ".png"
+
+
+def sprite_path(url, sprite_dir=SPRITE_DIR_PATH):
+    return os.path.join(sprite_dir, sprite_file_name(url))
+
+
+def build_sprite_bundle(urls, sprite_dir=SPRITE_DIR_PATH, out_dir=SPRITE_BUNDLE_PATH):
+    """
+    Packs the downloaded PNGs for urls into one sprites.bin plus an index.json of
+    url -> [offset, length]. URLs without a downloaded file are left out. The
+    bundle is built next to out_dir and swapped in with a rename.
+    """
+    entries = {}
+    with atomic_directory(out_dir, ".sprites-") as tmp_dir:
+        with open(os.path.join(tmp_dir, "sprites.bin"), "wb") as blob:
+            for url in sorted(set(urls)):
+                try:
+                    with open(sprite_path(url, sprite_dir), "rb") as f:
+                        data = f.read()
+                except OSError:
+                    continue
+                entries[url] = [blob.tell(), len(data)]
+                blob.write(data)
+        with open(os.path.join(tmp_dir, "index.json"), "w", encoding="utf-8") as f:
+            json.dump({"format_version": BUNDLE_FORMAT_VERSION, "entries": entries}, f)
+    return out_dir
+
+
+class SpriteBundle:
+    """
+    Read-only, memory-mapped sprite bundle. get(url) returns the PNG bytes for a
+    sprite URL, or None when the bundle does not have it. Looked-up images are
+    kept in memory, so repeated renders are a dict lookup.
+    """
+
+    def __init__(self, path, entries):
+        self.path = path
+        self.entries = entries
+        self._cache = {}
+        self._lock = threading.Lock()
+        with open(os.path.join(path, "sprites.bin"), "rb") as f:
+            # mmap rejects empty files; an empty bundle simply has no entries
+            self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+
+    def __contains__(self, url):
+        return url in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, url):
+        image = self._cache.get(url)
+        if image is not None:
+            return image
+        entry = self.entries.get(url)
+        if entry is None:
+            return None
+        offset, length = entry
+        image = bytes(self._blob[offset:offset + length])
+        with self._lock:
+            self._cache[url] = image
+        return image
+
+
+def load_sprite_bundle(path=SPRITE_BUNDLE_PATH):
+    """
+    Returns the SpriteBundle, or None when it is missing or from another format version.
+    """
+    try:
+        with open(os.path.join(path, "index.json"), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("format_version") != BUNDLE_FORMAT_VERSION:
+        return None
+    try:
+        return SpriteBundle(path, index["entries"])
+    except OSError:
+        return None
+
+
+if __name__ == "__main__":
+    with open(os.path.join("data", "pokemon_data.json"), "r", encoding="utf-8") as f:
+        urls = [record["sprite_url"] for record in json.load(f) if record.get("sprite_url")]
+    print(f"Sprite bundle written to {build_sprite_bundle(urls)}")
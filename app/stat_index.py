@@ -0,0 +1,126 @@
+"""
+KD-tree over base-stat profiles for nearest-neighbour lookups.
+
+Points are the six STAT_CATEGORIES of every row, optionally z-scored so each
+stat weighs the same. The tree is a flat array of nodes over a permutation of
+the rows; leaves hold up to leaf_size rows and are scanned with NumPy. Queries
+take an optional boolean row mask (e.g. unpacked from PokemonIndex.select_bits)
+so game and type filters prune candidates without rebuilding anything.
+"""
+import heapq
+import numpy as np
+
+from app.radar_chart import STAT_CATEGORIES
+
+LEAF_SIZE = 16
+
+
+class StatIndex:
+    """
+    KD-tree over the STAT_CATEGORIES of a Pokémon DataFrame. Row positions in
+    results refer to pokemon_df as passed in.
+    """
+
+    def __init__(self, pokemon_df, normalize=True, leaf_size=LEAF_SIZE):
+        stats = pokemon_df[STAT_CATEGORIES].to_numpy(dtype=np.float64)
+        self.names = {name.lower(): row for row, name in enumerate(pokemon_df["name"])}
+        self.mean = stats.mean(axis=0) if normalize and len(stats) else np.zeros(len(STAT_CATEGORIES))
+        scale = stats.std(axis=0) if normalize and len(stats) else np.ones(len(STAT_CATEGORIES))
+        self.scale = np.where(scale > 0, scale, 1.0)
+        self.points = self.transform(stats)
+        self.leaf_size = leaf_size
+
+        # Nodes: [start, stop) into self.order, bounding box, and children (-1 for leaves)
+        self.order = np.arange(len(stats))
+        self.bounds, self.box_min, self.box_max, self.children = [], [], [], []
+        if len(stats):
+            self._build(0, len(stats))
+        self.box_min = np.array(self.box_min)
+        self.box_max = np.array(self.box_max)
+
+    def transform(self, stats):
+        """
+        Maps raw stat vectors into the index's (optionally normalized) space.
+        """
+        return (np.asarray(stats, dtype=np.float64) - self.mean) / self.scale
+
+    def _build(self, start, stop):
+        node = len(self.bounds)
+        rows = self.order[start:stop]
+        points = self.points[rows]
+        self.bounds.append((start, stop))
+        self.box_min.append(points.min(axis=0))
+        self.box_max.append(points.max(axis=0))
+        self.children.append((-1, -1))
+        if stop - start <= self.leaf_size:
+            return node
+        # Split at the median of the widest dimension
+        dim = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+        self.order[start:stop] = rows[np.argsort(points[:, dim], kind="stable")]
+        middle = (start + stop) // 2
+        left = self._build(start, middle)
+        right = self._build(middle, stop)
+        self.children[node] = (left, right)
+        return node
+
+    def _box_distance(self, node, point):
+        gap = np.maximum(self.box_min[node] - point, 0) + np.maximum(point - self.box_max[node], 0)
+        return float(np.sqrt(gap @ gap))
+
+    def _search(self, point, limit, mask, k):
+        """
+        Best-first traversal; returns [(distance, row)] within limit, at most k
+        of them when k is given, nearest first.
+        """
+        found = []  # max-heap of (-distance, -row) once k results are held
+        if not self.bounds:
+            return []
+        frontier = [(self._box_distance(0, point), 0)]
+        while frontier:
+            box_distance, node = heapq.heappop(frontier)
+            bound = limit if k is None or len(found) < k else min(limit, -found[0][0])
+            if box_distance > bound:
+                break
+            left, right = self.children[node]
+            if left >= 0:
+                for child in (left, right):
+                    distance = self._box_distance(child, point)
+                    if distance <= bound:
+                        heapq.heappush(frontier, (distance, child))
+                continue
+            start, stop = self.bounds[node]
+            rows = self.order[start:stop]
+            if mask is not None:
+                rows = rows[mask[rows]]
+            diffs = self.points[rows] - point
+            for row, distance in zip(rows.tolist(), np.sqrt((diffs * diffs).sum(axis=1)).tolist()):
+                if distance > bound:
+                    continue
+                heapq.heappush(found, (-distance, -row))
+                if k is not None and len(found) > k:
+                    heapq.heappop(found)
+                    bound = min(limit, -found[0][0])
+        return sorted((-distance, -row) for distance, row in found)
+
+    def _query_point(self, query):
+        # A name or row position queries from that Pokémon's own stats
+        if isinstance(query, str):
+            return self.points[self.names[query.strip().lower()]]
+        if np.ndim(query) == 0:
+            return self.points[int(query)]
+        return self.transform(query)
+
+    def query(self, query, k=5, mask=None):
+        """
+        k nearest rows to query (a name, a row position or a raw stat vector),
+        restricted to rows where mask is True. Returns (rows, distances), nearest first.
+        """
+        results = self._search(self._query_point(query), np.inf, mask, k)
+        return np.array([row for _, row in results], dtype=np.intp), np.array([d for d, _ in results])
+
+    def query_radius(self, query, radius, mask=None):
+        """
+        Every row within radius of query, restricted by mask. Returns (rows, distances), nearest first.
+        """
+        results = self._search(self._query_point(query), radius, mask, None)
+        return np.array([row for _, row in results], dtype=np.intp), np.array([d for d, _ in results])
@@ -1,18 +1,34 @@
 
-from itertools import combinations
-import random
-from itertools import islice, combinations
-import pandas as pd
-from app.team_metrics import calculate_synergy_score
-
-def sample_combinations(pool, k, n_samples):
-    seen = set()
-    generator = combinations(pool, k)
-    for combo in generator:
-        if len(seen) >= n_samples:
-            break
-        seen.add(combo)
-        yield combo
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import heapq
+import os
+import time
+import numpy as np
+from app.combination_sampler import CombinationSampler
+from app.instrumentation import phase, count
+from app.local_search import DEFAULT_RESTARTS, anneal_top_teams
+from app.team_pool import TEAM_POOL_CACHE, TeamPool
+from app.team_metrics import (
+    ALL_TYPES, calculate_synergy_scores, calculate_coverage_scores,
+    calculate_weakness_penalties
+)
+
+# Number of candidate teams sampled and scored per vectorized batch
+SAMPLE_CHUNK_SIZE = 100_000
+# Smaller budgets are split into chunks of at least this many teams, a few per worker
+MIN_SAMPLE_CHUNK_SIZE = 10_000
+CHUNKS_PER_WORKER = 4
+
+def sample_combinations(pool, k, n_samples, seed=None):
+    """
+    Yields up to n_samples distinct k-tuples from pool in random order, or every
+    combination when there are no more than n_samples of them.
+    """
+    pool = list(pool)
+    sampler = CombinationSampler(len(pool), k, n_samples, seed)
+    for batch in sampler.batches(SAMPLE_CHUNK_SIZE):
+        for row in batch.tolist():
+            yield tuple(pool[i] for i in row)
 
 # Define evaluate_team at the top level of the module
 def evaluate_team(combo, locked_indices, pokemon_data):
@@ -21,26 +37,209 @@ def evaluate_team(combo, locked_indices, pokemon_data):
     synergy_score = sum(pokemon["total_stats"] for pokemon in team)
     return team, synergy_score
 
-def generate_top_team_candidates(
-    pokemon_df,
-    team_size=6,
-    top_n=5,
-    max_teams=1000,
-    locked_pokemon=None,
-    progress_callback=None
+def stratum_labels(pool, pool_positions, stratify_by):
+    """
+    Per-candidate stratum labels for CombinationSampler: None, or "type" to
+    stratify by each candidate's primary type.
+    """
+    if stratify_by is None:
+        return None
+    if stratify_by == "type":
+        return pool.primary_types[pool_positions]
+    raise ValueError(f"Unknown stratification: {stratify_by}")
+
+def sample_team_matrix(sampler, pool_positions, locked_positions, start, stop):
+    """
+    Samples start..stop-1 of sampler as an ((stop - start) x team_size) index
+    matrix. Rows are distinct teams; locked positions fill the leading columns.
+    """
+    sampled = np.asarray(pool_positions, dtype=np.intp)[sampler.batch(start, stop)]
+    locked = np.broadcast_to(np.asarray(locked_positions, dtype=np.intp), (stop - start, len(locked_positions)))
+    return np.concatenate([locked, sampled], axis=1)
+
+def score_team_matrix(pool, teams, objective="total_stats", coverage_weight=100, weakness_weight=0):
+    """
+    Scores an index matrix of teams under one of the search objectives:
+    "total_stats", "coverage" (distinct types covered) or "weighted"
+    (total_stats plus coverage_weight per covered type). A non-zero
+    weakness_weight subtracts that much per point of weakness penalty.
+    """
+    if objective == "total_stats":
+        scores = calculate_synergy_scores(pool, teams)
+    elif objective == "coverage":
+        scores = calculate_coverage_scores(pool, teams)
+    elif objective == "weighted":
+        scores = calculate_synergy_scores(pool, teams) + coverage_weight * calculate_coverage_scores(pool, teams)
+    else:
+        raise ValueError(f"Unknown objective: {objective}")
+    if weakness_weight:
+        scores = scores - weakness_weight * calculate_weakness_penalties(pool, teams)
+    return scores
+
+def _keep_top(teams, scores, top_n):
+    # Stable descending order so equal scores keep their sampling order
+    order = np.argsort(-scores, kind="stable")[:top_n]
+    return teams[order], scores[order]
+
+def _score_sample_chunk(state, start, stop):
+    pool, sampler, pool_positions, locked_positions, top_n, scoring = state
+    with phase("candidate_generation"):
+        teams = sample_team_matrix(sampler, pool_positions, locked_positions, start, stop)
+    with phase("scoring"):
+        scores = score_team_matrix(pool, teams, *scoring)
+    with phase("sorting"):
+        return _keep_top(teams, scores, top_n)
+
+# Search state installed once per worker process by the pool initializer
+_worker_state = None
+
+def _init_search_worker(state):
+    global _worker_state
+    _worker_state = state
+
+def _worker_score_chunk(start, stop):
+    return _score_sample_chunk(_worker_state, start, stop)
+
+def branch_and_bound_top_teams(values, k, top_n, score_fn=None, bound_fn=None, groups=None):
+    """
+    Exact top-N search over all k-subsets of a candidate array.
+
+    By default the score of a subset is the sum of its values and the bound is the
+    partial sum plus the k - len(chosen) largest values still reachable. For scores
+    that are not purely additive pass score_fn(chosen) and bound_fn(chosen, start),
+    where chosen is a tuple of candidate positions and bound_fn returns an upper
+    bound on the score of any completion drawn from candidates[start:].
+
+    groups optionally labels each candidate; subsets then hold at most one
+    candidate per group, and candidates whose group is taken are never visited.
+
+    Returns a list of (score, chosen) sorted best first.
+    """
+    values = np.asarray(values)
+    n = len(values)
+    if k > n or top_n <= 0:
+        return []
+
+    # Visit candidates in descending value order so the best completion is contiguous
+    order = np.argsort(-values, kind="stable")
+    sorted_values = values[order].tolist()
+    sorted_groups = np.asarray(groups)[order].tolist() if groups is not None else None
+    prefix = [0]
+    for v in sorted_values:
+        prefix.append(prefix[-1] + v)
+
+    if score_fn is None:
+        def score_fn(chosen):
+            return sum(sorted_values[i] for i in chosen)
+        additive = True
+    else:
+        # Callers reason in original candidate positions, not sorted ones
+        user_score, user_bound = score_fn, bound_fn
+        if user_bound is None:
+            raise ValueError("bound_fn is required when score_fn is given.")
+        def score_fn(chosen):
+            return user_score(tuple(order[i] for i in chosen))
+        def bound_fn(chosen, start):
+            return user_bound(tuple(order[i] for i in chosen), order[start:])
+        additive = False
+
+    heap = []  # min-heap of (score, -sequence, chosen) holding the current top N
+    sequence = 0
+
+    def visit(chosen, start, partial, used):
+        nonlocal sequence
+        remaining = k - len(chosen)
+        if remaining == 0:
+            score = partial if additive else score_fn(chosen)
+            sequence += 1
+            if len(heap) < top_n:
+                heapq.heappush(heap, (score, -sequence, chosen))
+            elif score > heap[0][0]:
+                heapq.heapreplace(heap, (score, -sequence, chosen))
+            return
+        for i in range(start, n - remaining + 1):
+            if len(heap) == top_n:
+                if additive:
+                    bound = partial + prefix[i + remaining] - prefix[i]
+                else:
+                    bound = bound_fn(chosen, i)
+                # Later siblings only have smaller values, so the whole level is done
+                if bound <= heap[0][0]:
+                    return
+            if sorted_groups is None:
+                visit(chosen + (i,), i + 1, partial + sorted_values[i], used)
+            elif sorted_groups[i] not in used:
+                visit(chosen + (i,), i + 1, partial + sorted_values[i], used | {sorted_groups[i]})
+
+    visit((), 0, 0, frozenset())
+
+    results = sorted(heap, key=lambda item: (-item[0], -item[1]))
+    return [(score, tuple(int(order[i]) for i in chosen)) for score, _, chosen in results]
+
+def coverage_bound_functions(stats, masks, k, base_mask=0, objective="coverage", coverage_weight=100):
+    """
+    Builds (values, score_fn, bound_fn) for branch_and_bound_top_teams under the
+    coverage objectives. base_mask holds types already covered by locked members.
+
+    The bound is set-cover style: a completion can gain at most the r largest
+    marginal contributions among the remaining candidates, and never more than
+    the types still uncovered.
+    """
+    stats = np.asarray(stats, dtype=np.int64)
+    masks = np.asarray(masks, dtype=np.uint32)
+    stat_weight = 0 if objective == "coverage" else 1
+    type_weight = 1 if objective == "coverage" else coverage_weight
+    stat_list = stats.tolist()
+    mask_list = masks.tolist()
+    n_types = len(ALL_TYPES)
+
+    def covered_by(chosen):
+        covered = base_mask
+        for i in chosen:
+            covered |= mask_list[i]
+        return covered
+
+    def score_fn(chosen):
+        return stat_weight * sum(stat_list[i] for i in chosen) + type_weight * covered_by(chosen).bit_count()
+
+    def bound_fn(chosen, rest):
+        r = k - len(chosen)
+        covered = covered_by(chosen)
+        bound = stat_weight * sum(stat_list[i] for i in chosen) + type_weight * covered.bit_count()
+        if r > len(rest):
+            return bound
+        gains = np.bitwise_count(masks[rest] & np.uint32(~covered & 0xFFFFFFFF)).astype(np.int64)
+        joint = stat_weight * stats[rest] + type_weight * gains
+        best_joint = np.partition(joint, len(joint) - r)[-r:].sum()
+        best_stats = np.partition(stats[rest], len(rest) - r)[-r:].sum() if stat_weight else 0
+        best_split = stat_weight * best_stats + type_weight * (n_types - covered.bit_count())
+        return bound + min(int(best_joint), int(best_split))
+
+    # Order candidates by their standalone contribution so good teams are found early
+    values = stat_weight * stats + type_weight * np.bitwise_count(masks & np.uint32(~base_mask & 0xFFFFFFFF))
+    return values, score_fn, bound_fn
+
+def prepare_search_pool(
+    pokemon_df, team_size, locked_pokemon=None, candidate_index=None, candidate_filters=None, one_per_family=False
 ):
+    """
+    Resolves the candidate pool and locked members for a search.
+    Returns (pool, pool_positions, locked_positions, num_remaining), with positions
+    indexing the TeamPool. Pools narrowed through candidate_index are cached per filter.
+    With one_per_family, candidates from a locked member's evolution family are
+    masked out of pool_positions up front.
+    """
     if locked_pokemon is None:
         locked_pokemon = []
 
-    # Normalize names for comparison
-    locked_lower = [p.strip().lower() for p in locked_pokemon]
-    locked_df = pokemon_df[pokemon_df["name"].str.strip().str.lower().isin(locked_lower)]
-    remaining_pool = pokemon_df[~pokemon_df["name"].str.strip().str.lower().isin(locked_lower)]
+    # Narrow through the prebuilt index and reuse the pool packed for the same filter
+    with phase("pool_packing"):
+        if candidate_index is not None:
+            pool = TEAM_POOL_CACHE.get(pokemon_df, candidate_index, candidate_filters)
+        else:
+            pool = TeamPool(pokemon_df)
 
-    # Debugging: Print locked Pokémon and DataFrame
-    print("Locked Pokémon:", locked_pokemon)
-    print("Locked Pokémon DataFrame:")
-    print(locked_df)
+    is_locked = pool.positions_of(locked_pokemon)
 
     # Ensure the number of locked Pokémon does not exceed the team size
     num_locked = len(locked_pokemon)
@@ -49,47 +248,237 @@ def generate_top_team_candidates(
 
     # Calculate the number of remaining Pokémon needed to complete the team
     num_remaining = team_size - num_locked
-    if num_remaining < 0:
-        return []
 
-    # Shuffle the remaining pool for randomness
-    pool = list(remaining_pool.index)
+    # Work on positional row indices into the packed pool
+    locked_positions = np.flatnonzero(is_locked)
+    pool_positions = np.flatnonzero(~is_locked)
+    if len(locked_positions) + num_remaining != team_size:
+        raise ValueError(f"Generated team size is incorrect: {len(locked_positions) + num_remaining} (expected {team_size})")
 
-    # Generate random teams by sampling from the remaining pool
-    sampled_combos = [
-        random.sample(pool, num_remaining) for _ in range(max_teams)
-    ]
+    available = len(pool_positions)
+    if one_per_family:
+        locked_families = pool.family_ids[locked_positions]
+        if len(np.unique(locked_families)) < len(locked_families):
+            raise ValueError("Locked Pokémon include more than one member of the same evolution family.")
+        pool_positions = pool_positions[~np.isin(pool.family_ids[pool_positions], locked_families)]
+        available = len(np.unique(pool.family_ids[pool_positions]))
+    if num_remaining > available:
+        raise ValueError("Not enough Pokémon in the pool to complete the team.")
 
-    # Convert locked Pokémon to indices
-    locked_indices = list(locked_df.index)
+    return pool, pool_positions, locked_positions, num_remaining
 
-    pokemon_data = pokemon_df.to_dict(orient="records")
+def generate_top_team_candidates(
+    pokemon_df,
+    team_size=6,
+    top_n=5,
+    max_teams=1000,
+    locked_pokemon=None,
+    progress_callback=None,
+    seed=None,
+    search_mode="sample",
+    n_workers=1,
+    objective="total_stats",
+    coverage_weight=100,
+    weakness_weight=0,
+    candidate_index=None,
+    candidate_filters=None,
+    restarts=DEFAULT_RESTARTS,
+    stratify_by=None,
+    one_per_family=False
+):
+    best = []
+    for evaluated, total, best, _, _ in _search_top_teams(
+        pokemon_df, team_size, top_n, max_teams, locked_pokemon, seed, search_mode, n_workers,
+        objective, coverage_weight, weakness_weight, candidate_index, candidate_filters,
+        restarts=restarts, stratify_by=stratify_by, one_per_family=one_per_family
+    ):
+        if progress_callback:
+            progress_callback(evaluated / total)
 
-    scored_teams = []
-    for i, combo in enumerate(sampled_combos):
-        # Combine locked Pokémon with the generated combination
-        full_team_indices = list(set(locked_indices + combo))  # Ensure unique indices
-        full_team = [pokemon_data[idx] for idx in full_team_indices]
-        print(f"Full Team: {[pokemon['name'] for pokemon in full_team]}")
+    # Only the final top N are converted back into row records
+    return best
 
-        # Ensure the team size is correct
-        if len(full_team) != team_size:
-            raise ValueError(f"Generated team size is incorrect: {len(full_team)} (expected {team_size})")
+def iter_top_team_candidates(
+    pokemon_df,
+    team_size=6,
+    top_n=5,
+    max_teams=1000,
+    locked_pokemon=None,
+    seed=None,
+    search_mode="sample",
+    n_workers=1,
+    objective="total_stats",
+    coverage_weight=100,
+    weakness_weight=0,
+    candidate_index=None,
+    candidate_filters=None,
+    time_budget=None,
+    cancel_event=None,
+    snapshot_interval=0.0,
+    restarts=DEFAULT_RESTARTS,
+    stratify_by=None,
+    one_per_family=False
+):
+    """
+    Anytime variant of generate_top_team_candidates. Yields snapshot dicts with the
+    best "teams" (row records) and their "scores" found so far, the number of
+    candidates "evaluated" out of "total", and whether the search is "done".
 
-        # Debugging: Print the full team
-        
-        # Convert the full team to a DataFrame
-        full_team_df = pd.DataFrame(full_team)
+    Snapshots are taken after each scored batch, at most once per snapshot_interval
+    seconds. The search stops early once time_budget seconds have passed or
+    cancel_event (a threading.Event) is set; the last snapshot is always final.
+    """
+    last_yield = None
+    for evaluated, total, teams, scores, done in _search_top_teams(
+        pokemon_df, team_size, top_n, max_teams, locked_pokemon, seed, search_mode, n_workers,
+        objective, coverage_weight, weakness_weight, candidate_index, candidate_filters,
+        time_budget, cancel_event, restarts, stratify_by, one_per_family
+    ):
+        now = time.monotonic()
+        if not done and last_yield is not None and now - last_yield < snapshot_interval:
+            continue
+        last_yield = now
+        yield {"teams": teams, "scores": scores, "evaluated": evaluated, "total": total, "done": done}
 
-        # Calculate synergy score (or other metrics)
-        synergy_score = calculate_synergy_score(full_team_df)  # Pass the DataFrame
-        scored_teams.append((full_team, synergy_score))
+def _search_top_teams(
+    pokemon_df,
+    team_size,
+    top_n,
+    max_teams,
+    locked_pokemon,
+    seed,
+    search_mode,
+    n_workers,
+    objective,
+    coverage_weight,
+    weakness_weight,
+    candidate_index,
+    candidate_filters,
+    time_budget=None,
+    cancel_event=None,
+    restarts=DEFAULT_RESTARTS,
+    stratify_by=None,
+    one_per_family=False
+):
+    """
+    Shared search loop; yields (evaluated, total, team records, scores, done).
+    Records are only built for the current top N. With one_per_family every mode
+    only generates teams with at most one member per evolution family.
+    """
+    started = time.monotonic()
+    pool, pool_positions, locked_positions, num_remaining = prepare_search_pool(
+        pokemon_df, team_size, locked_pokemon, candidate_index, candidate_filters, one_per_family
+    )
+    families = pool.family_ids[pool_positions] if one_per_family else None
 
-        if progress_callback:
-            progress_callback((i + 1) / len(sampled_combos))
+    def to_records(teams):
+        with phase("formatting"):
+            return [pool.records(team) for team in teams]
+
+    if search_mode == "exact":
+        if weakness_weight:
+            raise ValueError("The weakness penalty is only supported in sample mode.")
+        with phase("exact_search"):
+            if objective == "total_stats":
+                # Locked members contribute a constant, so rank completions by their own stats
+                results = branch_and_bound_top_teams(
+                    pool["total_stats"][pool_positions], num_remaining, top_n, groups=families
+                )
+            else:
+                locked_mask = int(np.bitwise_or.reduce(pool["type_masks"][locked_positions], initial=np.uint32(0)))
+                values, score_fn, bound_fn = coverage_bound_functions(
+                    pool["total_stats"][pool_positions], pool["type_masks"][pool_positions],
+                    num_remaining, locked_mask, objective, coverage_weight
+                )
+                results = branch_and_bound_top_teams(values, num_remaining, top_n, score_fn, bound_fn, families)
+        # Both searches rank completions only; add the locked members' stats back so
+        # scores are whole-team totals, as in the other modes
+        locked_stats = int(pool["total_stats"][locked_positions].sum()) if objective != "coverage" else 0
+        teams = [np.concatenate([locked_positions, pool_positions[list(chosen)]]) for _, chosen in results]
+        yield 1, 1, to_records(teams), [score + locked_stats for score, _ in results], True
+        return
+    if search_mode == "anneal":
+        # max_teams is the budget of swap evaluations, shared across restarts
+        with phase("local_search"):
+            results, spent = anneal_top_teams(
+                pool, pool_positions, locked_positions, num_remaining, top_n,
+                (objective, coverage_weight, weakness_weight), max_teams, restarts, seed,
+                time_budget, cancel_event, families
+            )
+        count("candidates_evaluated", spent)
+        yield spent, max_teams, to_records([team for _, team in results]), [score for score, _ in results], True
+        return
+    if search_mode != "sample":
+        raise ValueError(f"Unknown search mode: {search_mode}")
+
+    # Samples are numbered, so fixed chunks of sample numbers give the same
+    # teams for a given seed however many workers score them. The sampler never
+    # repeats a team and enumerates every completion when they fit in max_teams
+    with phase("candidate_generation"):
+        sampler = CombinationSampler(
+            len(pool_positions), num_remaining, max_teams, seed,
+            stratum_labels(pool, pool_positions, stratify_by), families
+        )
+    total = len(sampler)
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    # Chunk results are merged in chunk order, so the chunk size changes only
+    # how the work is spread, never which teams win
+    chunk_size = -(-total // (max(n_workers, 1) * CHUNKS_PER_WORKER))
+    chunk_size = min(max(chunk_size, MIN_SAMPLE_CHUNK_SIZE), SAMPLE_CHUNK_SIZE)
+    chunk_bounds = [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+    chunk_sizes = [stop - start for start, stop in chunk_bounds]
+    scoring = (objective, coverage_weight, weakness_weight)
+    state = (pool, sampler, pool_positions, locked_positions, top_n, scoring)
+    n_workers = min(n_workers, len(chunk_sizes))
+
+    chunk_results = [None] * len(chunk_sizes)
+    evaluated = 0
+
+    def should_stop():
+        if cancel_event is not None and cancel_event.is_set():
+            return True
+        return time_budget is not None and time.monotonic() - started >= time_budget
 
-    # Sort teams by synergy score in descending order
-    scored_teams.sort(key=lambda x: x[1], reverse=True)
+    def snapshot(done):
+        # Merge the per-chunk top N heaps in chunk order for deterministic tie-breaks
+        finished = [result for result in chunk_results if result is not None]
+        with phase("sorting"):
+            best_teams, best_scores = _keep_top(
+                np.concatenate([teams for teams, _ in finished]),
+                np.concatenate([scores for _, scores in finished]),
+                top_n,
+            )
+        return evaluated, total, to_records(best_teams), best_scores.tolist(), done
 
-    # Return the top N teams
-    return [team for team, _ in scored_teams[:top_n]]
\ No newline at end of file
+    if n_workers <= 1:
+        for i, (start, stop) in enumerate(chunk_bounds):
+            chunk_results[i] = _score_sample_chunk(state, start, stop)
+            evaluated += chunk_sizes[i]
+            count("candidates_evaluated", chunk_sizes[i])
+            done = evaluated == total or should_stop()
+            yield snapshot(done)
+            if done:
+                return
+    else:
+        # The packed pool is shipped to each worker once through the initializer
+        executor = ProcessPoolExecutor(
+            max_workers=n_workers, initializer=_init_search_worker, initargs=(state,)
+        )
+        try:
+            futures = {
+                executor.submit(_worker_score_chunk, start, stop): i
+                for i, (start, stop) in enumerate(chunk_bounds)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                chunk_results[i] = future.result()
+                evaluated += chunk_sizes[i]
+                count("candidates_evaluated", chunk_sizes[i])
+                done = evaluated == total or should_stop()
+                yield snapshot(done)
+                if done:
+                    return
+        finally:
+            # Abandon queued chunks when stopped early or when the caller closes the iterator
+            executor.shutdown(wait=True, cancel_futures=True)
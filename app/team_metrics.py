@@ -1,29 +1,175 @@
+import numpy as np
+from app.type_chart import ALL_TYPES, TYPE_INDEX, encode_defense_profiles
+
+ALL_TYPES_MASK = (1 << len(ALL_TYPES)) - 1
 
 
 def calculate_synergy_score(team_df):
     synergy_score = team_df['total_stats'].sum()
     return synergy_score
 
+def encode_type_mask(types):
+    """
+    Encodes a list of type names as an 18-bit mask; bit j follows ALL_TYPES[j].
+    """
+    mask = 0
+    for t in types:
+        bit = TYPE_INDEX.get(t.lower())
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
+
+def decode_type_mask(mask):
+    return [t for i, t in enumerate(ALL_TYPES) if mask >> i & 1]
+
+
 # Modify your evaluate_team_coverage function to account for the full list of types
 def evaluate_team_coverage(team_df):
-    all_types = set()
+    covered_mask = 0
+    for pokemon_types in team_df['types']:
+        covered_mask |= encode_type_mask(pokemon_types)
+
+    covered_types = decode_type_mask(covered_mask)
+    uncovered_types = decode_type_mask(ALL_TYPES_MASK & ~covered_mask)
 
-    # Collect types for each Pokémon in the team
-    for idx, row in team_df.iterrows():
-        # Assume that types are stored as a list of strings
-        pokemon_types = row['types']
-        all_types.update(pokemon_types)  # Add all types to the set (sets automatically handle duplicates)
+    return covered_types, uncovered_types
 
-    # List of all possible types (for simplicity, we're using a fixed list here)
-    all_possible_types = [
-        'bug', 'dark', 'dragon', 'electric', 'fairy', 'fighting', 'fire', 'flying',
-        'ghost', 'grass', 'ground', 'ice', 'normal', 'poison', 'psychic', 'rock', 'steel', 'water'
-    ]
 
-    # Find uncovered types by subtracting the covered types from the full set
-    uncovered_types = [t for t in all_possible_types if t not in all_types]
-    covered_types = [t for t in all_possible_types if t in all_types]
+def suggest_swaps(team_df, pokemon_df, stat_index, candidate_index=None, candidate_filters=None,
+                  k=3, max_distance=None, different_typing=True):
+    """
+    For each member of team_df, up to k Pokémon from pokemon_df with the closest
+    base-stat profile (see StatIndex), drawn from the rows candidate_index selects
+    for candidate_filters and never from the team itself. With different_typing,
+    candidates sharing the member's exact typing are skipped; max_distance turns
+    the k-nearest query into a radius query. stat_index and candidate_index must
+    be built over pokemon_df.
 
-    return covered_types, uncovered_types
+    Returns {member name: [(candidate name, distance), ...]} nearest first.
+    """
+    if candidate_index is not None:
+        allowed = np.unpackbits(candidate_index.select_bits(**(candidate_filters or {})), count=len(pokemon_df)).astype(bool)
+    else:
+        allowed = np.ones(len(pokemon_df), dtype=bool)
+    team_rows = [stat_index.names[name.strip().lower()] for name in team_df['name']]
+    allowed[team_rows] = False
+
+    names = pokemon_df['name'].tolist()
+    type_masks = np.fromiter(
+        (encode_type_mask(types) for types in pokemon_df['types']), dtype=np.uint32, count=len(pokemon_df)
+    )
+    suggestions = {}
+    for row in team_rows:
+        mask = allowed & (type_masks != type_masks[row]) if different_typing else allowed
+        if max_distance is None:
+            rows, distances = stat_index.query(row, k, mask)
+        else:
+            rows, distances = stat_index.query_radius(row, max_distance, mask)
+            rows, distances = rows[:k], distances[:k]
+        suggestions[names[row]] = [(names[r], round(float(d), 3)) for r, d in zip(rows, distances)]
+    return suggestions
+
+
+def pack_pokemon_pool(pokemon_df):
+    """
+    Packs a (filtered) Pokémon DataFrame into contiguous arrays for batch scoring.
+    Row i of every array corresponds to positional row i of pokemon_df.
+    """
+    total_stats = np.ascontiguousarray(pokemon_df['total_stats'].to_numpy(dtype=np.int64))
+    speed = np.ascontiguousarray(pokemon_df['speed'].to_numpy(dtype=np.int64))
+    type_masks = np.fromiter(
+        (encode_type_mask(types) for types in pokemon_df['types']), dtype=np.uint32, count=len(pokemon_df)
+    )
+
+    defense_profiles = encode_defense_profiles(list(pokemon_df['types']))
+
+    return {
+        "total_stats": total_stats,
+        "speed": speed,
+        "type_masks": type_masks,
+        "defense_profiles": defense_profiles,
+    }
+
+
+def calculate_synergy_scores(pool, teams):
+    """
+    Batch version of calculate_synergy_score.
+    teams is an (n_teams x team_size) matrix of row positions into the packed pool.
+    """
+    return pool["total_stats"][teams].sum(axis=1)
+
+
+def team_type_masks(pool, teams):
+    """
+    OR of the members' type masks for every team in the index matrix.
+    """
+    return np.bitwise_or.reduce(pool["type_masks"][teams], axis=1)
+
+
+def calculate_coverage_scores(pool, teams):
+    """
+    Number of distinct types covered by every team in the index matrix.
+    """
+    return np.bitwise_count(team_type_masks(pool, teams)).astype(np.int64)
+
+
+def evaluate_team_coverage_batch(pool, teams):
+    """
+    Batch version of evaluate_team_coverage.
+    Returns an (n_teams x n_types) boolean matrix; column j follows ALL_TYPES[j].
+    """
+    masks = team_type_masks(pool, teams)
+    return (masks[:, None] >> np.arange(len(ALL_TYPES), dtype=np.uint32) & 1).astype(bool)
+
+
+def team_defense_profiles(pool, teams):
+    """
+    Defensive profile of every team in the index matrix, reduced per attacking type.
+    Returns a dict of (n_teams x n_types) counts: members weak to the type, members
+    resisting or immune to it, and members taking 4x damage from it.
+    """
+    codes = pool["defense_profiles"][teams]
+    return {
+        "weak": (codes > 0).sum(axis=1),
+        "resist": (codes < 0).sum(axis=1),
+        "quad_weak": (codes == 2).sum(axis=1),
+    }
+
+
+def calculate_weakness_penalties(pool, teams):
+    """
+    Penalty per team: for every attacking type, weak members not offset by a resisting
+    member, plus one extra for each stacked 4x weakness.
+    """
+    profiles = team_defense_profiles(pool, teams)
+    uncovered = np.clip(profiles["weak"] - profiles["resist"], 0, None)
+    return (uncovered.sum(axis=1) + profiles["quad_weak"].sum(axis=1)).astype(np.int64)
+
+
+def evaluate_team_weakness(team_df):
+    """
+    Single-team counterpart of team_defense_profiles, keyed by type name.
+    """
+    codes = encode_defense_profiles(list(team_df['types']))
+    weak = (codes > 0).sum(axis=0)
+    resist = (codes < 0).sum(axis=0)
+    return {t: (int(weak[i]), int(resist[i])) for i, t in enumerate(ALL_TYPES)}
+
+
+# Objectives for multi-objective search; every column is oriented so larger is better
+TEAM_OBJECTIVES = ["total_stats", "coverage", "speed", "weakness"]
 
 
+def team_objective_matrix(pool, teams, objectives=TEAM_OBJECTIVES):
+    """
+    (n_teams x n_objectives) matrix of team objective values: total stats, types
+    covered, summed speed and the negated weakness penalty.
+    """
+    columns = {
+        "total_stats": lambda: calculate_synergy_scores(pool, teams),
+        "coverage": lambda: calculate_coverage_scores(pool, teams),
+        "speed": lambda: pool["speed"][teams].sum(axis=1),
+        "weakness": lambda: -calculate_weakness_penalties(pool, teams),
+    }
+    return np.stack([columns[name]() for name in objectives], axis=1).astype(np.int64)
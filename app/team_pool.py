@@ -0,0 +1,124 @@
+"""
+Immutable, array-backed candidate pool for team searches.
+
+A TeamPool holds only what scoring needs: stat and speed columns, type masks,
+defense profiles, integer primary-type and family codes and normalized names, all as
+read-only NumPy arrays indexed by pool position. The source frame is kept by
+reference and turned back into row dicts only for the teams that are returned.
+Pools are built once per (index, filter) and shared by later searches.
+"""
+import threading
+from collections import OrderedDict
+import numpy as np
+
+from app.dataset_index import FamilyIndex
+from app.team_metrics import pack_pokemon_pool
+from app.type_chart import TYPE_INDEX
+
+# Filtered pools kept per candidate index
+MAX_CACHED_POOLS = 32
+
+
+class TeamPool:
+    """
+    Read-only packed pool. pool[column] returns the packed array, so a TeamPool
+    can be passed anywhere the team_metrics batch functions expect a packed pool.
+    """
+
+    __slots__ = (
+        "names", "primary_types", "family_ids", "total_stats", "speed", "type_masks", "defense_profiles", "_frame"
+    )
+
+    def __init__(self, pokemon_df, family_ids=None):
+        packed = pack_pokemon_pool(pokemon_df)
+        if family_ids is None:
+            family_ids = FamilyIndex(pokemon_df).ids
+        columns = dict(
+            packed,
+            names=pokemon_df["name"].str.strip().str.lower().to_numpy(dtype=str),
+            primary_types=np.array(
+                [TYPE_INDEX.get(types[0].lower(), -1) if types else -1 for types in pokemon_df["types"]],
+                dtype=np.int8,
+            ),
+            family_ids=np.array(family_ids, dtype=np.int32),
+        )
+        for name, values in columns.items():
+            values.flags.writeable = False
+            object.__setattr__(self, name, values)
+        object.__setattr__(self, "_frame", pokemon_df)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TeamPool is immutable")
+
+    def __getstate__(self):
+        # Workers only score, so the frame stays in the parent process
+        return {name: getattr(self, name) for name in self.__slots__ if name != "_frame"}
+
+    def __setstate__(self, state):
+        for name, values in state.items():
+            object.__setattr__(self, name, values)
+        object.__setattr__(self, "_frame", None)
+
+    def __getitem__(self, column):
+        if column not in self.__slots__ or column.startswith("_"):
+            raise KeyError(column)
+        return getattr(self, column)
+
+    def __len__(self):
+        return len(self.total_stats)
+
+    @property
+    def frame(self):
+        return self._frame
+
+    def positions_of(self, names):
+        """
+        Boolean mask of pool positions whose name is in names (case-insensitive).
+        """
+        return np.isin(self.names, [name.strip().lower() for name in names])
+
+    def records(self, positions):
+        """
+        Row dicts of the source frame for the given pool positions.
+        """
+        return self._frame.iloc[positions].to_dict(orient="records")
+
+
+class TeamPoolCache:
+    """
+    Thread-safe LRU of TeamPools keyed by candidate index and filters. Entries
+    hold the frame and index they were built from and only match those same
+    objects, so a reloaded dataset never reuses a stale pool.
+    """
+
+    def __init__(self, max_entries=MAX_CACHED_POOLS):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, pokemon_df, candidate_index, candidate_filters=None):
+        filters = candidate_filters or {}
+        key = (id(candidate_index), id(pokemon_df), repr(sorted(filters.items())))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is pokemon_df and entry[1] is candidate_index:
+                self._entries.move_to_end(key)
+                return entry[2]
+
+        # Build outside the lock; a concurrent duplicate build is harmless
+        rows = candidate_index.select(**filters)
+        # Family ids come from the index built once over the whole frame
+        pool = TeamPool(pokemon_df.iloc[rows], candidate_index.family.ids[rows])
+        with self._lock:
+            self._entries[key] = (pokemon_df, candidate_index, pool)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return pool
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+TEAM_POOL_CACHE = TeamPoolCache()
@@ -0,0 +1,81 @@
+import numpy as np
+
+# Canonical type order shared by the packed pool and the coverage helpers
+ALL_TYPES = [
+    'bug', 'dark', 'dragon', 'electric', 'fairy', 'fighting', 'fire', 'flying',
+    'ghost', 'grass', 'ground', 'ice', 'normal', 'poison', 'psychic', 'rock', 'steel', 'water'
+]
+TYPE_INDEX = {t: i for i, t in enumerate(ALL_TYPES)}
+
+# Attacking type -> defending types it does not hit for neutral damage
+SUPER_AND_RESISTED = {
+    "normal": {"rock": 0.5, "ghost": 0, "steel": 0.5},
+    "fire": {"fire": 0.5, "water": 0.5, "grass": 2, "ice": 2, "bug": 2, "rock": 0.5, "dragon": 0.5, "steel": 2},
+    "water": {"fire": 2, "water": 0.5, "grass": 0.5, "ground": 2, "rock": 2, "dragon": 0.5},
+    "electric": {"water": 2, "electric": 0.5, "grass": 0.5, "ground": 0, "flying": 2, "dragon": 0.5},
+    "grass": {"fire": 0.5, "water": 2, "grass": 0.5, "poison": 0.5, "ground": 2, "flying": 0.5, "bug": 0.5,
+              "rock": 2, "dragon": 0.5, "steel": 0.5},
+    "ice": {"fire": 0.5, "water": 0.5, "grass": 2, "ice": 0.5, "ground": 2, "flying": 2, "dragon": 2, "steel": 0.5},
+    "fighting": {"normal": 2, "ice": 2, "poison": 0.5, "flying": 0.5, "psychic": 0.5, "bug": 0.5, "rock": 2,
+                 "ghost": 0, "dark": 2, "steel": 2, "fairy": 0.5},
+    "poison": {"grass": 2, "poison": 0.5, "ground": 0.5, "rock": 0.5, "ghost": 0.5, "steel": 0, "fairy": 2},
+    "ground": {"fire": 2, "electric": 2, "grass": 0.5, "poison": 2, "flying": 0, "bug": 0.5, "rock": 2, "steel": 2},
+    "flying": {"electric": 0.5, "grass": 2, "fighting": 2, "bug": 2, "rock": 0.5, "steel": 0.5},
+    "psychic": {"fighting": 2, "poison": 2, "psychic": 0.5, "dark": 0, "steel": 0.5},
+    "bug": {"fire": 0.5, "grass": 2, "fighting": 0.5, "poison": 0.5, "flying": 0.5, "psychic": 2, "ghost": 0.5,
+            "dark": 2, "steel": 0.5, "fairy": 0.5},
+    "rock": {"fire": 2, "ice": 2, "fighting": 0.5, "ground": 0.5, "flying": 2, "bug": 2, "steel": 0.5},
+    "ghost": {"normal": 0, "psychic": 2, "ghost": 2, "dark": 0.5},
+    "dragon": {"dragon": 2, "steel": 0.5, "fairy": 0},
+    "dark": {"fighting": 0.5, "psychic": 2, "ghost": 2, "dark": 0.5, "fairy": 0.5},
+    "steel": {"fire": 0.5, "water": 0.5, "electric": 0.5, "ice": 2, "rock": 2, "steel": 0.5, "fairy": 2},
+    "fairy": {"fire": 0.5, "fighting": 2, "poison": 0.5, "dragon": 2, "dark": 2, "steel": 0.5},
+}
+
+def _build_type_chart():
+    chart = np.ones((len(ALL_TYPES), len(ALL_TYPES)), dtype=np.float32)
+    for attacker, row in SUPER_AND_RESISTED.items():
+        for defender, multiplier in row.items():
+            chart[TYPE_INDEX[attacker], TYPE_INDEX[defender]] = multiplier
+    return chart
+
+# TYPE_CHART[attack, defense] is the damage multiplier, both axes following ALL_TYPES
+TYPE_CHART = _build_type_chart()
+
+# Multipliers are stored compactly as int8 log2 codes; immunity gets its own sentinel
+IMMUNE_CODE = -8
+_MULTIPLIER_CODES = {0.0: IMMUNE_CODE, 0.25: -2, 0.5: -1, 1.0: 0, 2.0: 1, 4.0: 2}
+
+
+def defensive_multipliers(types):
+    """
+    Damage multiplier of every attacking type against a (dual-)typed defender.
+    """
+    multipliers = np.ones(len(ALL_TYPES), dtype=np.float32)
+    for t in types:
+        col = TYPE_INDEX.get(t.lower())
+        if col is not None:
+            multipliers *= TYPE_CHART[:, col]
+    return multipliers
+
+
+def encode_defense_profiles(type_lists):
+    """
+    Precomputes the defensive profile of every Pokémon as an (n_pokemon x n_types)
+    int8 matrix of multiplier codes. Profiles are built once per distinct typing.
+    """
+    profiles = np.zeros((len(type_lists), len(ALL_TYPES)), dtype=np.int8)
+    by_typing = {}
+    for row, types in enumerate(type_lists):
+        key = tuple(sorted(t.lower() for t in types))
+        if key not in by_typing:
+            by_typing[key] = np.array(
+                [_MULTIPLIER_CODES[float(m)] for m in defensive_multipliers(key)], dtype=np.int8
+            )
+        profiles[row] = by_typing[key]
+    return profiles
+
+
+def decode_multipliers(codes):
+    codes = np.asarray(codes)
+    return np.where(codes == IMMUNE_CODE, 0.0, np.exp2(codes.astype(np.float32)))
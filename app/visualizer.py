@@ -1,11 +1,14 @@
-import matplotlib.pyplot as plt
 import streamlit as st
-import seaborn as sns
-import collections
 from app.type_icons import TYPE_EMOJIS
+from app.team_metrics import evaluate_team_weakness
+from app.chart_renderer import register_chart_kind, render_chart
 
 
-def visualize_synergy_scores(synergy_scores):
+def build_synergy_scores_figure(synergy_scores):
+    # Plotting libraries load on first use; the theme is applied by the renderer
+    from matplotlib.figure import Figure
+    import seaborn as sns
+
     sorted_scores = sorted(enumerate(synergy_scores), key=lambda x: x[1], reverse=True)
     indices, scores = zip(*sorted_scores)
 
@@ -13,18 +16,24 @@ def visualize_synergy_scores(synergy_scores):
     data = {"Team": [f"Team {i+1}" for i in indices], "Synergy Score": scores}
 
     # Create the plot
-    sns.set_style(style="darkgrid")  # Set Seaborn theme
-    plt.style.use("dark_background")  # Use Seaborn style for Matplotlib
-    fig, ax = plt.subplots(figsize=(4, 2))  # Adjust size as needed
-    sns.barplot(x="Team", y="Synergy Score", data=data, ax=ax, palette="spring")  # Use Seaborn for barplot
+    fig = Figure(figsize=(4, 2))  # Adjust size as needed
+    ax = fig.add_subplot()
+    sns.barplot(x="Team", y="Synergy Score", hue="Team", data=data, ax=ax, palette="spring", legend=False)  # Use Seaborn for barplot
 
     # Customize the plot
     ax.set_title("Team Synergy Scores", fontsize=14)
     ax.set_xlabel("Team", fontsize=12)
     ax.set_ylabel("Synergy Score", fontsize=12)
-    ax.bar_label(ax.containers[0], fmt="%.0f", fontsize=8)  # Add labels above bars
+    for container in ax.containers:
+        ax.bar_label(container, fmt="%.0f", fontsize=8)  # Add labels above bars
+
+    return fig
 
-    st.pyplot(fig)
+def synergy_scores_job(synergy_scores):
+    return ("synergy_scores", tuple(float(s) for s in synergy_scores))
+
+def visualize_synergy_scores(synergy_scores):
+    st.image(render_chart(synergy_scores_job(synergy_scores)))
 
 def visualize_team_composition(covered_types, uncovered_types):
     st.subheader("✅ Covered Types")
@@ -41,29 +50,35 @@ def visualize_team_composition(covered_types, uncovered_types):
 
 
 
-def visualize_weakness_resistance(team):
-    all_weaknesses = []
-    all_resistances = []
-    for _, row in team.iterrows():
-        all_weaknesses.extend(row.get("weaknesses", []))
-        all_resistances.extend(row.get("resistances", []))
+def build_weakness_resistance_figure(type_counts):
+    # type_counts is a sequence of (type, (weak, resist)) pairs
+    from matplotlib.figure import Figure
 
-    # Count each type
-    weakness_count = collections.Counter(all_weaknesses)
-    resistance_count = collections.Counter(all_resistances)
+    types = [t for t, (weak, resist) in type_counts if weak or resist]
+    counts = dict(type_counts)
 
-    types = list(set(weakness_count.keys()) | set(resistance_count.keys()))
-    types.sort()
-
-    weak_vals = [weakness_count.get(t, 0) for t in types]
-    resist_vals = [resistance_count.get(t, 0) for t in types]
+    weak_vals = [counts[t][0] for t in types]
+    resist_vals = [counts[t][1] for t in types]
     labels = [f"{TYPE_EMOJIS.get(t.lower(), '')} {t.title()}" for t in types]
 
-    fig, ax = plt.subplots(figsize=(10, 5))
+    fig = Figure(figsize=(10, 5))
+    ax = fig.add_subplot()
     ax.bar(labels, weak_vals, label="Weak", color='salmon')
     ax.bar(labels, resist_vals, bottom=weak_vals, label="Resistant", color='lightgreen')
     ax.set_title("Team Weakness vs Resistance by Type")
     ax.set_ylabel("Count")
+    ax.set_xticks(range(len(labels)))
     ax.set_xticklabels(labels, rotation=45, ha='right')
     ax.legend()
-    st.pyplot(fig)
+    return fig
+
+def weakness_resistance_job(counts):
+    # counts maps type -> (weak, resist), as returned by evaluate_team_weakness
+    return ("weakness_resistance", tuple(sorted(counts.items())))
+
+def visualize_weakness_resistance(team):
+    # Counts of weak and resisting members per attacking type, from the type chart
+    st.image(render_chart(weakness_resistance_job(evaluate_team_weakness(team))))
+
+register_chart_kind("synergy_scores", build_synergy_scores_figure)
+register_chart_kind("weakness_resistance", build_weakness_resistance_figure)
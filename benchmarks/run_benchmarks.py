@@ -0,0 +1,206 @@
+"""
+Headless benchmark suite for the team builder.
+
+    python -m benchmarks.run_benchmarks --sizes 100 1000 10000 --output benchmarks/baselines/local.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/baselines/local.json
+
+Every stage reports throughput, latency percentiles and peak traced memory.
+With --compare the run fails when a stage's median latency regresses by more
+than --tolerance against the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import matplotlib
+matplotlib.use("Agg")
+
+from app.data_loader import fetch_pokemon_data
+from app.chart_renderer import ChartCache, render_chart, render_charts
+from app.radar_chart import radar_job
+from app.team_builder import generate_top_team_candidates
+from app.team_metrics import evaluate_team_coverage, evaluate_team_coverage_batch, pack_pokemon_pool
+from benchmarks.synthetic_data import generate_pokedex
+
+DEFAULT_SIZES = [100, 1000, 10000, 50000]
+SAMPLED_TEAMS = 200_000
+
+
+class _SessionState(dict):
+    __getattr__ = dict.get
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+
+def stub_streamlit(game_choice):
+    """
+    Installs a do-nothing `streamlit` module so web/streamlit_app.py runs headless.
+    Widgets return fixed selections and the Generate button stays unpressed.
+    """
+    st = mock.MagicMock(name="streamlit")
+    st.session_state = _SessionState()
+    st.cache_data = lambda func=None, **kwargs: func if func else (lambda f: f)
+    st.cache_resource = st.cache_data
+    st.columns.side_effect = lambda spec, **kwargs: [mock.MagicMock() for _ in range(spec if isinstance(spec, int) else len(spec))]
+    st.selectbox.side_effect = lambda label, options, **kwargs: game_choice if game_choice in options else options[0]
+    st.checkbox.return_value = True
+    st.slider.side_effect = lambda label, **kwargs: kwargs.get("value")
+    st.multiselect.return_value = []
+    st.button.return_value = False
+    st.tabs.side_effect = lambda labels: [mock.MagicMock() for _ in labels]
+    sys.modules["streamlit"] = st
+    return st
+
+
+def measure(func, repeats, items_per_call=1):
+    """
+    Runs func repeatedly and returns latency percentiles, throughput and the
+    peak memory traced during one extra call.
+    """
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = np.asarray(latencies)
+    return {
+        "repeats": repeats,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "throughput_per_s": float(items_per_call / np.median(latencies)),
+        "peak_mem_mb": peak / 1024 / 1024,
+    }
+
+
+def bench_size(n_pokemon, repeats):
+    records = generate_pokedex(n_pokemon, seed=n_pokemon)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            os.makedirs("data")
+            with open(os.path.join("data", "pokemon_data.json"), "w", encoding="utf-8") as f:
+                json.dump(records, f, indent=2)
+            results["fetch_pokemon_data"] = measure(fetch_pokemon_data, repeats)
+
+            pokemon_df = fetch_pokemon_data()
+            finals = pokemon_df[pokemon_df["is_final_evolution"]].reset_index(drop=True)
+
+            results["generate_sampled"] = measure(
+                lambda: generate_top_team_candidates(finals, max_teams=SAMPLED_TEAMS, seed=0),
+                repeats, SAMPLED_TEAMS,
+            )
+            results["generate_exact"] = measure(
+                lambda: generate_top_team_candidates(finals, search_mode="exact"), repeats
+            )
+
+            team_df = finals.iloc[:6]
+            results["evaluate_team_coverage"] = measure(lambda: evaluate_team_coverage(team_df), repeats)
+            pool = pack_pokemon_pool(finals)
+            teams = np.random.default_rng(0).integers(0, len(finals), size=(SAMPLED_TEAMS, 6))
+            results["evaluate_team_coverage_batch"] = measure(
+                lambda: evaluate_team_coverage_batch(pool, teams), repeats, SAMPLED_TEAMS
+            )
+
+            # The Streamlit filter pipeline, from a cold session through the lock-in widget
+            stub_streamlit(game_choice="Black")
+            sys.modules.pop("web.streamlit_app", None)
+            from web import streamlit_app
+
+            def run_main():
+                sys.modules["streamlit"].session_state.clear()
+                streamlit_app.main()
+
+            results["streamlit_filter_pipeline"] = measure(run_main, repeats)
+
+            # A zero-byte cache never stores, so every call renders from scratch
+            uncached = ChartCache(max_bytes=0)
+            results["render_radar_chart"] = measure(lambda: render_chart(radar_job(team_df, 0), cache=uncached), repeats)
+            page_jobs = [radar_job(finals.iloc[i * 6:(i + 1) * 6], i, f"Team {i+1}") for i in range(5)]
+            results["render_result_page_charts"] = measure(
+                lambda: render_charts(page_jobs, cache=uncached), repeats, len(page_jobs)
+            )
+        finally:
+            os.chdir(cwd)
+
+    return results
+
+
+def compare(current, baseline, tolerance):
+    """
+    Returns a list of (size, stage, ratio) whose median latency regressed beyond tolerance.
+    """
+    regressions = []
+    for size, stages in current["results"].items():
+        for stage, metrics in stages.items():
+            before = baseline["results"].get(size, {}).get(stage)
+            if not before:
+                continue
+            ratio = metrics["p50_ms"] / max(before["p50_ms"], 1e-9)
+            print(f"{size:>7} {stage:<32} {before['p50_ms']:10.2f} -> {metrics['p50_ms']:10.2f} ms  x{ratio:.2f}")
+            if ratio > 1 + tolerance:
+                regressions.append((size, stage, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", help="Write results as a JSON baseline to this path")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed median slowdown, e.g. 0.25 for 25%%")
+    args = parser.parse_args(argv)
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {},
+    }
+    for size in args.sizes:
+        print(f"Benchmarking {size} Pokémon...")
+        report["results"][str(size)] = bench_size(size, args.repeats)
+        for stage, metrics in report["results"][str(size)].items():
+            print(
+                f"  {stage:<32} p50 {metrics['p50_ms']:9.2f} ms  p95 {metrics['p95_ms']:9.2f} ms  "
+                f"{metrics['throughput_per_s']:14,.0f}/s  peak {metrics['peak_mem_mb']:8.2f} MB"
+            )
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            for size, stage, ratio in regressions:
+                print(f"REGRESSION: {stage} at {size} Pokémon is {ratio:.2f}x slower")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""
+Cold-start budget check for the Streamlit app.
+
+    python -m benchmarks.startup_benchmark --import-budget 1.0 --render-budget 3.0
+
+Each measurement runs in a fresh interpreter. Import time covers importing
+web/streamlit_app.py after Streamlit itself is loaded (the server has it already);
+time-to-first-render runs the script once through Streamlit's AppTest harness.
+Exits non-zero when a median exceeds its budget or when a plotting library was
+imported before any chart was requested.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PLOTTING_MODULES = ["matplotlib", "seaborn"]
+
+_PROBE = r"""
+import json, sys, time, warnings
+warnings.simplefilter("ignore")
+sys.path.insert(0, {root!r})
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+started = time.perf_counter()
+import web.streamlit_app
+imported = time.perf_counter()
+
+app = AppTest.from_file("web/streamlit_app.py", default_timeout=120)
+app.run()
+rendered = time.perf_counter()
+
+print(json.dumps({{
+    "import_s": imported - started,
+    "first_render_s": rendered - imported,
+    "exceptions": [str(e.value) for e in app.exception],
+    "plotting_loaded": [m for m in {plotting!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_probe():
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(root=REPO_ROOT, plotting=PLOTTING_MODULES)],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--import-budget", type=float, default=float(os.environ.get("STARTUP_IMPORT_BUDGET", 1.0)),
+                        help="Seconds allowed for importing the app (env STARTUP_IMPORT_BUDGET)")
+    parser.add_argument("--render-budget", type=float, default=float(os.environ.get("STARTUP_RENDER_BUDGET", 3.0)),
+                        help="Seconds allowed until the first render completes (env STARTUP_RENDER_BUDGET)")
+    args = parser.parse_args(argv)
+
+    probes = [run_probe() for _ in range(args.runs)]
+    import_s = statistics.median(p["import_s"] for p in probes)
+    render_s = statistics.median(p["first_render_s"] for p in probes)
+    print(f"import:       {import_s:.3f} s (budget {args.import_budget:.3f} s)")
+    print(f"first render: {render_s:.3f} s (budget {args.render_budget:.3f} s)")
+
+    failures = []
+    if import_s > args.import_budget:
+        failures.append("import time over budget")
+    if render_s > args.render_budget:
+        failures.append("time-to-first-render over budget")
+    for probe in probes:
+        failures.extend(f"app raised: {e}" for e in probe["exceptions"])
+        failures.extend(f"{m} imported during startup" for m in probe["plotting_loaded"])
+
+    for failure in sorted(set(failures)):
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
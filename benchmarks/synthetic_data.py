@@ -0,0 +1,67 @@
+import numpy as np
+
+from app.type_chart import ALL_TYPES
+
+# Rough share of each primary type among real Pokémon
+TYPE_WEIGHTS = {
+    "water": 0.14, "normal": 0.11, "grass": 0.09, "bug": 0.08, "psychic": 0.06, "fire": 0.06,
+    "rock": 0.05, "electric": 0.05, "poison": 0.04, "ground": 0.04, "dark": 0.04, "fighting": 0.04,
+    "dragon": 0.03, "ghost": 0.03, "steel": 0.03, "ice": 0.03, "fairy": 0.03, "flying": 0.02,
+}
+DUAL_TYPE_RATE = 0.5
+
+# Games grouped by generation; a Pokémon appears in its debut generation and most later ones
+GAME_GENERATIONS = [
+    ["red", "blue", "yellow"],
+    ["gold", "silver", "crystal"],
+    ["ruby", "sapphire", "emerald", "firered", "leafgreen"],
+    ["diamond", "pearl", "platinum", "heartgold", "soulsilver"],
+    ["black", "white", "black-2", "white-2"],
+]
+STAT_NAMES = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+
+def generate_pokedex(n_pokemon, seed=0):
+    """
+    Generates n_pokemon schema-compatible records (the same fields as
+    data/pokemon_data.json) with realistic type, game and evolution distributions.
+    """
+    rng = np.random.default_rng(seed)
+    types = list(TYPE_WEIGHTS)
+    type_p = np.array(list(TYPE_WEIGHTS.values()))
+    type_p = type_p / type_p.sum()
+
+    records = []
+    while len(records) < n_pokemon:
+        # Families of one to three stages that share typing and debut generation
+        stages = min(int(rng.choice([1, 2, 3], p=[0.3, 0.35, 0.35])), n_pokemon - len(records))
+        first_id = len(records) + 1
+        chain = [f"synthmon-{first_id + s}" for s in range(stages)]
+        primary = types[rng.choice(len(types), p=type_p)]
+        secondary = None
+        if rng.random() < DUAL_TYPE_RATE:
+            secondary = rng.choice([t for t in ALL_TYPES if t != primary])
+        debut = min(int(rng.integers(0, len(GAME_GENERATIONS))), len(GAME_GENERATIONS) - 1)
+        games = [
+            game
+            for gen, titles in enumerate(GAME_GENERATIONS[debut:], start=debut)
+            if gen == debut or rng.random() < 0.8
+            for game in titles
+        ]
+        base = rng.normal(55, 12, size=len(STAT_NAMES))
+
+        for stage, name in enumerate(chain):
+            stats = np.clip(base * (1 + 0.35 * stage) + rng.normal(0, 8, size=len(STAT_NAMES)), 5, 255).astype(int)
+            record = {
+                "id": first_id + stage,
+                "name": name,
+                "types": [primary] + ([str(secondary)] if secondary else []),
+                "total_stats": int(stats.sum()),
+                "sprite_url": None,
+                "games": games,
+                "evolution_chain": chain if stages > 1 else [name],
+                "is_final_evolution": stage == stages - 1,
+            }
+            record.update({stat: int(value) for stat, value in zip(STAT_NAMES, stats)})
+            records.append(record)
+    return records
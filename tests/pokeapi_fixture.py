@@ -0,0 +1,162 @@
+"""
+Minimal local stand-in for the PokéAPI endpoints data_cacher uses.
+
+The server answers /pokemon?limit=, /pokemon/<id>, /species/<name> and
+/chain/<root> from a small in-memory dataset, counts requests per path, and can
+fail chosen paths with a 503 a given number of times before answering. Bodies
+carry an ETag and a matching If-None-Match gets a 304; patches (path -> fields
+merged into the body) simulate upstream changes between runs.
+"""
+import hashlib
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STAT_NAMES = ["hp", "attack", "defense", "special-attack", "special-defense", "speed"]
+
+# (id, name, species, types); forms share their species and so its chain
+POKEMON = [
+    (1, "bulbasaur", "bulbasaur", ["grass", "poison"]),
+    (2, "ivysaur", "ivysaur", ["grass", "poison"]),
+    (3, "venusaur", "venusaur", ["grass", "poison"]),
+    (133, "eevee", "eevee", ["normal"]),
+    (134, "vaporeon", "vaporeon", ["water"]),
+    (135, "jolteon", "jolteon", ["electric"]),
+    (413, "wormadam-plant", "wormadam", ["bug", "grass"]),
+    (10004, "wormadam-sandy", "wormadam", ["bug", "ground"]),
+]
+# Evolution trees as (species, [children])
+CHAINS = {
+    "bulbasaur": ("bulbasaur", [("ivysaur", [("venusaur", [])])]),
+    "eevee": ("eevee", [("vaporeon", []), ("jolteon", [])]),
+    "burmy": ("burmy", [("wormadam", []), ("mothim", [])]),
+}
+
+
+def _chain_index():
+    root_of, parent_of = {}, {}
+
+    def walk(node, root, parent):
+        species, children = node
+        root_of[species], parent_of[species] = root, parent
+        for child in children:
+            walk(child, root, species)
+
+    for root, tree in CHAINS.items():
+        walk(tree, root, None)
+    return root_of, parent_of
+
+
+ROOT_OF, PARENT_OF = _chain_index()
+
+
+def _nest(node):
+    species, children = node
+    return {"species": {"name": species}, "evolves_to": [_nest(child) for child in children]}
+
+
+class PokeApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] += 1
+            failing = server.failures[self.path] > 0
+            if failing:
+                server.failures[self.path] -= 1
+        if failing:
+            return self._send(503, {})
+
+        base = f"http://127.0.0.1:{server.server_port}"
+        kind, _, ident = self.path.strip("/").partition("/")
+        if kind.startswith("pokemon?"):
+            body = {"results": [{"name": name, "url": f"{base}/pokemon/{pid}"} for pid, name, _, _ in POKEMON]}
+        elif kind == "pokemon":
+            pid, name, species, types = next(p for p in POKEMON if str(p[0]) == ident)
+            body = {
+                "id": pid,
+                "name": name,
+                "stats": [{"stat": {"name": stat}, "base_stat": 50} for stat in STAT_NAMES],
+                "game_indices": [{"version": {"name": "platinum"}}],
+                "species": {"url": f"{base}/species/{species}"},
+                "types": [{"type": {"name": t}} for t in types],
+                "sprites": {"front_default": None},
+            }
+        elif kind == "species":
+            parent = PARENT_OF[ident]
+            body = {
+                "name": ident,
+                "evolves_from_species": {"name": parent} if parent else None,
+                "evolution_chain": {"url": f"{base}/chain/{ROOT_OF[ident]}"},
+            }
+        elif kind == "chain":
+            body = {"chain": _nest(CHAINS[ident])}
+        else:
+            return self._send(404, {})
+        body.update(server.patches.get(self.path, {}))
+
+        etag = '"%s"' % hashlib.sha1(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            with server.lock:
+                server.not_modified[self.path] += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send(200, body, etag)
+
+    def _send(self, status, body, etag=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class PokeApiFixture:
+    """
+    Runs the fixture server on a free local port for the duration of a with block.
+    fail_once lists paths that answer 503 on their first request; hits and
+    not_modified count requests and 304 answers per path.
+    """
+
+    def __init__(self, fail_once=()):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), PokeApiHandler)
+        self.server.lock = threading.Lock()
+        self.server.hits = Counter()
+        self.server.failures = Counter({path: 1 for path in fail_once})
+        self.server.not_modified = Counter()
+        self.server.patches = {}
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    @property
+    def hits(self):
+        return self.server.hits
+
+    @property
+    def not_modified(self):
+        return self.server.not_modified
+
+    @property
+    def patches(self):
+        return self.server.patches
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,25 @@
+from app.byte_lru import ByteLRU
+
+
+def test_evicts_least_recently_used_past_the_byte_bound():
+    cache = ByteLRU(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"
+    cache.put("c", b"1234")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234" and cache.get("c") == b"1234"
+    assert cache.current_bytes == 8 and len(cache) == 2
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_replacing_and_oversized_values():
+    cache = ByteLRU(max_bytes=10)
+    cache.put("a", b"12345678")
+    cache.put("a", b"12")
+    assert cache.current_bytes == 2
+    cache.put("a", b"x" * 11)
+    assert cache.get("a") is None and cache.current_bytes == 0
+    cache.put("b", b"1")
+    cache.clear()
+    assert len(cache) == 0 and cache.current_bytes == 0
@@ -0,0 +1,151 @@
+import json
+from itertools import combinations
+from math import comb
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.combination_sampler import (
+    CombinationSampler, GroupedSubsets, RankPermutation, rank_combinations, unrank_combinations
+)
+
+DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "pokemon_data.json"
+
+
+def rows(array):
+    return [tuple(row) for row in np.asarray(array).tolist()]
+
+
+def test_rank_round_trip():
+    combos = np.array(list(combinations(range(9), 4)))
+    ranks = rank_combinations(combos, 9)
+    assert sorted(ranks.tolist()) == list(range(comb(9, 4)))
+    assert rows(unrank_combinations(ranks, 9, 4)) == rows(combos)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 17, 1000, 4097])
+def test_feistel_permutation_is_a_bijection(size):
+    permutation = RankPermutation(size, [1, 2, 3, 4])
+    assert sorted(permutation(np.arange(size)).tolist()) == list(range(size))
+
+
+def test_samples_are_distinct_sorted_and_in_range():
+    sampler = CombinationSampler(30, 5, budget=5000, seed=7)
+    teams = sampler.batch(0, len(sampler))
+    assert len(sampler) == 5000 and not sampler.exhaustive
+    assert len(set(rows(teams))) == len(teams)
+    assert (np.diff(teams, axis=1) > 0).all()
+    assert teams.min() >= 0 and teams.max() < 30
+
+
+def test_exhaustive_when_every_subset_fits():
+    sampler = CombinationSampler(10, 3, budget=comb(10, 3), seed=1)
+    assert sampler.exhaustive
+    assert sorted(rows(sampler.batch(0, len(sampler)))) == list(combinations(range(10), 3))
+
+
+def test_batches_do_not_depend_on_split():
+    sampler = CombinationSampler(25, 4, budget=3000, seed=3)
+    whole = sampler.batch(0, len(sampler))
+    split = np.concatenate([sampler.batch(a, b) for a, b in [(0, 1), (1, 1000), (1000, 2999), (2999, 3000)]])
+    assert np.array_equal(whole, split)
+    assert np.array_equal(np.concatenate(list(sampler.batches(7))), whole)
+    # A fresh sampler with the same seed draws the same teams; another seed does not
+    assert np.array_equal(CombinationSampler(25, 4, budget=3000, seed=3).batch(0, 3000), whole)
+    assert not np.array_equal(CombinationSampler(25, 4, budget=3000, seed=4).batch(0, 3000), whole)
+
+
+def test_grouped_subsets_hold_one_member_per_group():
+    groups = np.array([0, 0, 0, 1, 2, 2, 3, 4, 5, 5, 6, 7])
+    expected = [c for c in combinations(range(len(groups)), 4) if len(set(groups[list(c)])) == 4]
+    space = GroupedSubsets(groups, 4)
+    assert space.total == len(expected)
+    assert sorted(rows(space.unrank(np.arange(space.total)))) == expected
+
+    sampler = CombinationSampler(len(groups), 4, budget=50, seed=2, groups=groups)
+    teams = rows(sampler.batch(0, len(sampler)))
+    assert len(teams) == 50 and len(set(teams)) == 50
+    assert all(len(set(groups[list(team)])) == 4 for team in teams)
+
+    exhaustive = CombinationSampler(len(groups), 4, budget=10 ** 6, seed=2, groups=groups)
+    assert sorted(rows(exhaustive.batch(0, len(exhaustive)))) == expected
+
+
+def test_strata_share_the_budget():
+    strata = np.array([2, 0, 1, 2, 0, 1, 2, 0, 1, 2, 0, 1, 0, 0])
+    sampler = CombinationSampler(len(strata), 3, budget=90, seed=5, strata=strata)
+    teams = sampler.batch(0, len(sampler))
+    assert len(set(rows(teams))) == len(teams) == 90
+    assert rank_combinations(teams, len(strata)).tolist() == sampler.ranks(0, 90).tolist()
+
+    # Samples are grouped by the stratum of the team's highest member. Each
+    # group gets a quota of 90 // 6 = 15, and the other 45 follow what each
+    # group has left: stratum 0 holds 216 teams, stratum 1 94 and stratum 2 54
+    top = strata[teams.max(axis=1)]
+    assert np.bincount(top).tolist() == [15 + 28, 15 + 11, 15 + 6]
+
+    exhaustive = CombinationSampler(len(strata), 3, budget=10 ** 6, seed=5, strata=strata)
+    assert sorted(rows(exhaustive.batch(0, len(exhaustive)))) == list(combinations(range(len(strata)), 3))
+
+
+def test_type_strata_do_not_depend_on_label_order():
+    with open(DATA_PATH) as f:
+        records = [record for record in json.load(f) if record["is_final_evolution"]]
+    types = np.array([record["types"][0] for record in records])
+    names = np.unique(types)
+    budget = 60000
+
+    def type_shares(strata):
+        sampler = CombinationSampler(len(types), 6, budget=budget, seed=0, strata=strata)
+        teams = sampler.batch(0, len(sampler))
+        if strata is not None:
+            # Every type leads at least its quota of teams
+            assert np.bincount(strata[teams.max(axis=1)]).min() >= budget // (2 * len(names))
+        return {name: (types[teams] == name).any(axis=1).mean() for name in names}
+
+    uniform = type_shares(None)
+    codes = np.searchsorted(names, types)
+    # Reversing the label order leaves each type's share of teams alone, and
+    # both track uniform sampling
+    for stratified in [type_shares(codes), type_shares(len(names) - 1 - codes)]:
+        assert all(abs(stratified[name] - uniform[name]) < 0.05 for name in names)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        CombinationSampler(3, 4, budget=10)
+    with pytest.raises(ValueError):
+        CombinationSampler(5, 2, budget=10, strata=[0] * 5, groups=[0] * 5)
+    with pytest.raises(ValueError):
+        CombinationSampler(5, 2, budget=10, groups=[0, 1])
+
+
+@pytest.mark.parametrize("n", [4884, 50000])
+def test_subset_counts_beyond_64_bits(n):
+    # C(n, 6) exceeds 2 ** 64, so ranks are Python ints until they fit int64
+    sampler = CombinationSampler(n, 6, budget=20000, seed=0)
+    assert sampler.total > 2 ** 64
+    teams = sampler.batch(0, len(sampler))
+    assert len(set(rows(teams))) == len(teams) == 20000
+    assert (np.diff(teams, axis=1) > 0).all() and teams.max() < n
+    assert np.array_equal(np.concatenate([sampler.batch(0, 777), sampler.batch(777, 20000)]), teams)
+    assert rank_combinations(teams[:50], n).tolist() == sampler.ranks(0, 50).tolist()
+
+
+def test_feistel_permutation_beyond_64_bits():
+    size = 3 * 2 ** 90 + 12345
+    values = RankPermutation(size, [5, 6, 7, 8])(np.arange(10000))
+    assert len(set(values.tolist())) == 10000
+    assert all(0 <= value < size for value in values)
+
+
+@pytest.mark.parametrize("groups", [np.arange(5000) // 3, np.minimum(np.arange(5000) // 2, np.arange(5000) - 750)])
+def test_grouped_subset_counts_beyond_64_bits(groups):
+    sampler = CombinationSampler(len(groups), 6, budget=20000, seed=0, groups=groups)
+    assert sampler.total > 2 ** 64
+    teams = sampler.batch(0, len(sampler))
+    assert len(set(rows(teams))) == len(teams) == 20000
+    assert (np.diff(teams, axis=1) > 0).all() and teams.max() < len(groups)
+    assert all(len(set(groups[team])) == 6 for team in teams.tolist())
+    assert np.array_equal(np.concatenate([sampler.batch(0, 777), sampler.batch(777, 20000)]), teams)
@@ -0,0 +1,109 @@
+import asyncio
+import json
+
+from app.scripts import data_cacher
+from tests.pokeapi_fixture import POKEMON, PokeApiFixture, _nest
+
+
+def fetch(fixture, monkeypatch, **kwargs):
+    monkeypatch.setattr(data_cacher, "BACKOFF_SECONDS", 0.01)
+    return asyncio.run(data_cacher.fetch_all_details(
+        limit=len(POKEMON), api_base_url=fixture.base_url, rate=1000, **kwargs
+    ))
+
+
+def detail_hits(fixture):
+    return sum(hits for path, hits in fixture.hits.items() if not path.startswith("/pokemon?"))
+
+
+def test_species_and_chains_fetched_once(monkeypatch):
+    with PokeApiFixture() as fixture:
+        records = fetch(fixture, monkeypatch)
+
+    assert [r["id"] for r in records] == sorted(p[0] for p in POKEMON)
+    species = [path for path in fixture.hits if path.startswith("/species/")]
+    chains = [path for path in fixture.hits if path.startswith("/chain/")]
+    # Two wormadam forms share a species; every family shares one chain
+    assert len(species) == 7 and len(chains) == 3
+    assert all(fixture.hits[path] == 1 for path in species + chains)
+
+    by_name = {r["name"]: r for r in records}
+    assert by_name["ivysaur"]["evolves_from"] == "bulbasaur"
+    assert by_name["venusaur"]["is_final_evolution"] and not by_name["ivysaur"]["is_final_evolution"]
+    assert by_name["vaporeon"]["is_final_evolution"] and by_name["jolteon"]["is_final_evolution"]
+    assert by_name["wormadam-sandy"]["evolution_chain"] == ["burmy", "wormadam", "mothim"]
+
+
+def test_unavailable_response_is_retried(monkeypatch):
+    with PokeApiFixture(fail_once=["/pokemon/133", "/chain/bulbasaur"]) as fixture:
+        records = fetch(fixture, monkeypatch)
+
+    assert fixture.hits["/pokemon/133"] == 2
+    assert fixture.hits["/chain/bulbasaur"] == 2
+    by_name = {r["name"]: r for r in records}
+    assert by_name["eevee"]["evolution_chain"] == ["eevee", "vaporeon", "jolteon"]
+    assert by_name["bulbasaur"]["evolution_chain"] == ["bulbasaur", "ivysaur", "venusaur"]
+
+
+def test_complete_records_are_skipped(monkeypatch):
+    with PokeApiFixture() as fixture:
+        first = fetch(fixture, monkeypatch)
+        known = {record["id"]: record for record in first}
+        # An entry cached before its chain was known is fetched again
+        known[134] = {**known[134], "evolution_chain": []}
+        fixture.hits.clear()
+        second = fetch(fixture, monkeypatch, known_records=known)
+
+    assert second == first
+    assert fixture.hits["/pokemon/134"] == 1
+    assert sorted(path for path in fixture.hits if path.startswith("/pokemon/")) == ["/pokemon/134"]
+
+
+def test_interrupted_run_resumes_from_checkpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_cacher, "BACKOFF_SECONDS", 0.01)
+    monkeypatch.chdir(tmp_path)
+    with PokeApiFixture() as fixture:
+        records = fetch(fixture, monkeypatch)
+        # The interrupted run checkpointed two records and was killed mid-write
+        (tmp_path / "data").mkdir()
+        lines = [json.dumps(record) for record in records[:2]] + [json.dumps(records[2])[:40]]
+        (tmp_path / "data" / "pokemon_data.checkpoint.jsonl").write_text("\n".join(lines))
+        assert sorted(data_cacher.load_checkpoint()) == [1, 2]
+        fixture.hits.clear()
+        data_cacher.cache_data(limit=len(POKEMON), api_base_url=fixture.base_url, sprites=False)
+
+    assert fixture.hits["/pokemon/1"] == fixture.hits["/pokemon/2"] == 0
+    assert fixture.hits["/pokemon/3"] == 1
+    assert json.loads((tmp_path / "data" / "pokemon_data.json").read_text()) == records
+    assert not (tmp_path / "data" / "pokemon_data.checkpoint.jsonl").exists()
+    validators = json.loads((tmp_path / "data" / "pokemon_data.validators.json").read_text())
+    assert validators[f"{fixture.base_url}/pokemon/3"]["etag"]
+
+
+def test_revalidation_follows_species_and_chain_changes(monkeypatch):
+    validators = {}
+    with PokeApiFixture() as fixture:
+        first = fetch(fixture, monkeypatch, validators=validators)
+        known = {record["id"]: record for record in first}
+
+        # Nothing changed: every Pokémon, species and chain answers 304 once
+        fixture.hits.clear()
+        again = fetch(fixture, monkeypatch, known_records=known, validators=validators, revalidate=True)
+        assert again == first
+        assert sum(fixture.not_modified.values()) == detail_hits(fixture) == 8 + 7 + 3
+
+        # A new branch in Eevee's chain is picked up although /pokemon/133 is unchanged
+        fixture.patches["/chain/eevee"] = {
+            "chain": _nest(("eevee", [("vaporeon", []), ("jolteon", []), ("flareon", [])]))
+        }
+        fixture.hits.clear()
+        fixture.not_modified.clear()
+        changed = fetch(fixture, monkeypatch, known_records=known, validators=validators, revalidate=True)
+
+    by_name = {record["name"]: record for record in changed}
+    assert by_name["eevee"]["evolution_chain"] == ["eevee", "vaporeon", "jolteon", "flareon"]
+    assert by_name["jolteon"]["evolution_chain"] == by_name["eevee"]["evolution_chain"]
+    assert by_name["bulbasaur"] == known[1]
+    assert fixture.hits["/chain/eevee"] == 1 and fixture.not_modified["/chain/eevee"] == 0
+    # /pokemon/133 itself still answered 304; the changed chain forced the refetch
+    assert fixture.not_modified["/pokemon/133"] == 1 and fixture.hits["/pokemon/133"] == 2
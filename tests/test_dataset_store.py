@@ -0,0 +1,19 @@
+import os
+
+import pytest
+
+from app.dataset_store import atomic_directory
+
+
+def test_atomic_directory_replaces_only_on_success(tmp_path):
+    out_dir = tmp_path / "out"
+    with atomic_directory(out_dir, ".test-") as tmp_dir:
+        (tmp_path / tmp_dir / "a").write_text("1")
+    assert os.listdir(out_dir) == ["a"]
+
+    with pytest.raises(RuntimeError):
+        with atomic_directory(out_dir, ".test-") as tmp_dir:
+            (tmp_path / tmp_dir / "b").write_text("2")
+            raise RuntimeError
+    assert os.listdir(out_dir) == ["a"]
+    assert sorted(os.listdir(tmp_path)) == ["out"]
@@ -0,0 +1,42 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from app.local_search import anneal_top_teams
+from app.team_builder import prepare_search_pool
+
+TYPES = ["fire", "water", "grass", "electric", "ice", "rock", "ghost", "dragon"]
+
+
+@pytest.fixture
+def search_pool():
+    rows = [
+        {
+            "id": i, "name": f"mon{i}", "types": [TYPES[i % len(TYPES)]], "hp": 40 + i, "attack": 50,
+            "defense": 50, "special-attack": 50, "special-defense": 50, "speed": 30 + 2 * i,
+            "total_stats": 270 + i, "is_final_evolution": True, "evolution_chain": [f"mon{i}"], "games": [],
+        }
+        for i in range(20)
+    ]
+    return prepare_search_pool(pd.DataFrame(rows), 4)
+
+
+def test_spends_the_whole_budget(search_pool):
+    results, spent = anneal_top_teams(*search_pool, top_n=3, evaluations=1001, restarts=4, seed=0)
+    assert spent == 1001
+    assert len(results) == 3
+    assert [score for score, _ in results] == sorted((score for score, _ in results), reverse=True)
+
+
+def test_reports_evaluations_spent_when_cancelled(search_pool):
+    cancel = threading.Event()
+    cancel.set()
+    results, spent = anneal_top_teams(*search_pool, top_n=3, evaluations=50_000, seed=0, cancel_event=cancel)
+    assert 0 < spent < 50_000
+    assert results
+
+
+def test_unknown_objective(search_pool):
+    with pytest.raises(ValueError):
+        anneal_top_teams(*search_pool, top_n=3, scoring=("speed", 100, 0), evaluations=10)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from app.dataset_index import PokemonIndex
+from app.pareto import generate_pareto_team_candidates, pareto_front_indices, thin_front
+from app.scripts import batch_generate
+from tests.test_team_builder import small_pokedex
+
+
+def brute_force_front(points):
+    return [
+        i for i, p in enumerate(points)
+        if not any((q >= p).all() and (q > p).any() for q in points)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pareto_front_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    # Few distinct values, so ties and duplicate points are common; more points
+    # than one seed block so the screening loop runs several times
+    points = rng.integers(0, 8, size=(700, 3))
+    assert pareto_front_indices(points).tolist() == brute_force_front(points)
+
+
+def test_thin_front_keeps_the_extremes():
+    rng = np.random.default_rng(0)
+    # Points on the plane x + y + z = 100 are mutually non-dominated
+    xy = rng.integers(0, 50, size=(200, 2))
+    points = np.column_stack([xy, 100 - xy.sum(axis=1)])
+    keep = thin_front(points, 20)
+    assert len(keep) == 20 and (np.diff(keep) > 0).all()
+    for j in range(points.shape[1]):
+        assert points[keep, j].max() == points[:, j].max()
+        assert points[keep, j].min() == points[:, j].min()
+    assert thin_front(points[:10], 20).tolist() == list(range(10))
+
+
+def test_pareto_search_returns_a_bounded_front():
+    pokedex = small_pokedex(20)
+    front = generate_pareto_team_candidates(pokedex, team_size=4, max_teams=2000, seed=1, max_front_size=8)
+    points = np.array([list(objectives.values()) for objectives in front["objectives"]])
+    assert front["done"] and 0 < len(points) <= 8
+    assert brute_force_front(points) == list(range(len(points)))
+
+
+def test_batch_jobs_run_in_pareto_mode(monkeypatch):
+    pokedex = small_pokedex(20)
+    monkeypatch.setattr(batch_generate, "_worker_data", (pokedex, PokemonIndex(pokedex)))
+    query = {
+        "job_id": "j", "game": "red", "locked": ["mon3"], "team_size": 4, "top_n": 5,
+        "search_mode": "pareto", "objective": "total_stats", "max_teams": 2000, "seed": 0,
+    }
+    result = batch_generate.run_job(query)
+    assert "error" not in result
+    assert 0 < len(result["teams"]) == len(result["objectives"]) <= 5
+    assert all("mon3" in team for team in result["teams"])
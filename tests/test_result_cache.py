@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from app.result_cache import (
+    TeamResultCache, cached_generate_top_team_candidates, prewarm_team_cache, team_query_key
+)
+from app.shared_dataset import SharedDataset
+
+TYPES = ["fire", "water", "grass", "electric", "ice", "rock", "ghost", "dragon"]
+
+
+def pokedex(n=24):
+    rng = np.random.default_rng(1)
+    rows = []
+    for i in range(n):
+        stats = rng.integers(30, 130, size=6)
+        rows.append({
+            "id": i + 1, "name": f"mon{i:02d}", "types": [TYPES[i % len(TYPES)]],
+            "hp": stats[0], "attack": stats[1], "defense": stats[2], "special-attack": stats[3],
+            "special-defense": stats[4], "speed": stats[5], "total_stats": int(stats.sum()),
+            "sprite_url": None, "games": ["red"] if i % 2 else ["red", "blue"],
+            "evolution_chain": [f"mon{i:02d}"], "is_final_evolution": True,
+        })
+    # Names out of id order, like a frame whose display order differs from its index order
+    return pd.DataFrame(rows[::-1]).reset_index(drop=True)
+
+
+def test_query_key():
+    df = pokedex()
+    key = team_query_key(df, locked_pokemon=["Mon01", "mon03"], team_size=6)
+    assert key == team_query_key(df, locked_pokemon=[" mon03", "mon01"], team_size=6)
+    assert key != team_query_key(df, locked_pokemon=["mon01", "mon03"], team_size=5)
+    # Sampled teams depend on pool order, so a reordered pool is another query
+    assert key != team_query_key(df.sort_values("name"), locked_pokemon=["mon01", "mon03"], team_size=6)
+
+
+def test_repeated_query_hits():
+    df = pokedex()
+    cache = TeamResultCache()
+    first = cached_generate_top_team_candidates(df, cache=cache, team_size=4, max_teams=500, seed=0)
+    progress = []
+    # Explicit defaults and the worker count do not change the key
+    second = cached_generate_top_team_candidates(
+        df, cache=cache, team_size=4, max_teams=500, seed=0, top_n=5, one_per_family=False,
+        n_workers=2, progress_callback=progress.append
+    )
+    assert second == first
+    assert progress == [1.0]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    cached_generate_top_team_candidates(df, cache=cache, team_size=4, max_teams=500, seed=1)
+    assert cache.stats()["misses"] == 2
+
+
+def test_prewarmed_queries_serve_the_app():
+    dataset = SharedDataset(pokedex())
+    cache = TeamResultCache()
+    params = dict(team_size=4, top_n=3, max_teams=500, seed=0)
+    assert prewarm_team_cache(dataset.frame, dataset.index, cache=cache, **params) == 2
+
+    # The app searches a view's filters, with title-cased game names
+    for game in ("Red", "Blue"):
+        view = dataset.view(game=game, final_only=True)
+        teams = cached_generate_top_team_candidates(
+            dataset.frame, cache=cache, candidate_index=dataset.index, candidate_filters=view.filters,
+            locked_pokemon=[], **params
+        )
+        assert len(teams) == 3
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 2
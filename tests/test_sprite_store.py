@@ -0,0 +1,13 @@
+from app.sprite_store import build_sprite_bundle, load_sprite_bundle, sprite_path
+
+
+def test_sprite_bundle_round_trip(tmp_path):
+    sprite_dir = tmp_path / "sprites"
+    sprite_dir.mkdir()
+    urls = ["https://example.invalid/1.png", "https://example.invalid/2.png"]
+    with open(sprite_path(urls[0], sprite_dir), "wb") as f:
+        f.write(b"png-1")
+
+    bundle = load_sprite_bundle(build_sprite_bundle(urls, sprite_dir, tmp_path / "bundle"))
+    assert len(bundle) == 1
+    assert bundle.get(urls[0]) == b"png-1" and bundle.get(urls[1]) is None
@@ -1,21 +1,38 @@
 import sys
 import os
+import logging
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import streamlit as st
 import pandas as pd
-from app.data_loader import fetch_pokemon_data
-from app.team_builder import generate_top_team_candidates
-from app.team_metrics import calculate_synergy_score, evaluate_team_coverage
-from app.visualizer import visualize_team_composition, visualize_synergy_scores
-from app.radar_chart import plot_team_radar_chart
-import time
+from app.shared_dataset import load_shared_dataset, format_types
+from app.result_cache import TEAM_RESULT_CACHE, cached_generate_top_team_candidates
+from app.team_metrics import calculate_synergy_score, evaluate_team_coverage, suggest_swaps
+from app.visualizer import visualize_team_composition, synergy_scores_job
+from app.radar_chart import radar_job
+from app.chart_renderer import render_charts
 from app.type_icons import TYPE_EMOJIS
+from app.sprite_store import load_sprite_bundle
+from app import instrumentation
+from app.instrumentation import phase
+
+# Debug output is opt-in: LOG_LEVEL=DEBUG, and POKEMON_METRICS=1 for per-phase timings
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "WARNING").upper())
+logger = logging.getLogger(__name__)
+
+# Candidate teams sampled per search. Searches always run to the end of their budget
+# (never to a wall-clock limit), so the same query gives the same teams and can be cached
+SEARCH_BUDGETS = [100_000, 250_000, 1_000_000, 2_500_000]
+SEARCH_MAX_TEAMS = 1_000_000
+# Fixed seed so repeated queries are reproducible and can share cached results
+SEARCH_SEED = 0
 
 
 # Function to display sprites in a responsive layout
 def display_sprites_with_columns(pokemon_team, columns_per_row=3):
+    sprites = load_sprites()
+
     # Inject CSS to ensure inline layout for icons and names
     st.markdown(
         """
@@ -39,8 +56,10 @@ def display_sprites_with_columns(pokemon_team, columns_per_row=3):
             with col:
                 # Get type icons for the Pokémon
                 type_icons = " ".join(TYPE_EMOJIS.get(t.lower(), t.title()) for t in pokemon["types"])
-                # Display the sprite
-                st.image(pokemon["sprite_url"], width=80)
+                # Display the sprite from the local bundle, falling back to its URL
+                sprite = sprites.get(pokemon["sprite_url"]) if sprites is not None else None
+                if sprite is not None or pokemon["sprite_url"]:
+                    st.image(sprite if sprite is not None else pokemon["sprite_url"], width=80)
                 # Display the name and type icons in a single line
                 st.markdown(
                     f'<div class="sprite-caption">{type_icons} {pokemon["name"]}</div>',
@@ -48,61 +67,49 @@ def display_sprites_with_columns(pokemon_team, columns_per_row=3):
                 )
 
 
-@st.cache_data
-def time_function(func):
-    def wrapper(*args, **kwargs):
-        start = time.time()
-        result = func(*args, **kwargs)
-        end = time.time()
-        st.write(f"Function {func.__name__} took {end - start:.4f} seconds")
-        return result
-    return wrapper
-
+@st.cache_resource(show_spinner=False)
 def load_pokemon_data():
-    return fetch_pokemon_data()
+    # Loaded once per server process and shared read-only by every session
+    return load_shared_dataset()
+
+@st.cache_resource(show_spinner=False)
+def load_sprites():
+    # Sprite bundle written by data_cacher, or None when it has not been built
+    return load_sprite_bundle()
 
 def get_type_emojis(pokemon_types):
     return " ".join(TYPE_EMOJIS.get(t.lower(), t.title()) for t in pokemon_types)
 
+def render_metrics_panel(metrics):
+    report = metrics.as_dict()
+    with st.expander("⏱️ Timings (debug)"):
+        st.write(f"Total: {report['total_ms']:.1f} ms")
+        st.dataframe(pd.DataFrame(
+            [{"phase": name, "ms": values["ms"], "calls": values["calls"]} for name, values in report["phases"].items()]
+        ))
+        if report["counts"]:
+            st.json(report["counts"])
+
 def main():
+    with instrumentation.request("streamlit_rerun") as metrics:
+        render_page()
+    if metrics is not None:
+        render_metrics_panel(metrics)
+
+def render_page():
     st.title("Pokémon Team Builder")
 
-    # Initialize session state variables
-    if "pokemon_data" not in st.session_state:
-        st.session_state.pokemon_data = None
-    if "pokemon_loaded" not in st.session_state:
-        st.session_state.pokemon_loaded = False
+    # Session state only holds this user's selections; the dataset is shared
     if "teams_generated" not in st.session_state:
         st.session_state.teams_generated = False
-    if "top_teams" not in st.session_state:
-        st.session_state.top_teams = []
-
-    # Automatically load Pokémon data if not already loaded
-    if not st.session_state.pokemon_loaded:
-        with st.spinner("Fetching Pokémon data... Please wait."):
-            progress_bar = st.progress(0)  # Initialize progress bar
-            user_feedback_loading_message = st.markdown("### Loading Pokémon data...")
-
-            # Simulate progress updates
-            for i in range(1, 6):
-                time.sleep(0.5)  # Simulate work
-                progress_bar.progress(i * 20)  # Increment progress
-
-            # Load Pokémon data
-            pokemon_df = load_pokemon_data()
-            pokemon_df = pokemon_df[pokemon_df["is_final_evolution"] == True].reset_index(drop=True)
-            st.session_state.pokemon_data = pokemon_df
-            st.session_state.pokemon_loaded = True
-            user_feedback_loading_message.empty()
-            progress_bar.empty()
 
+    with st.spinner("Fetching Pokémon data... Please wait."):
+        dataset = load_pokemon_data()
 
     # Proceed to filters and team generation
     st.write("🔧 Team Filters")
 
-    pokemon_df = st.session_state.pokemon_data
-    pokemon_df['games'] = pokemon_df['games'].apply(lambda x: x if isinstance(x, list) else [])
-    game_options = [game.title() for game in pokemon_df['games'].explode().dropna().unique()]
+    game_options = dataset.game_options
 
     with st.expander("🔍 Filters", expanded=True):
         col1, col2 = st.columns(2)
@@ -110,95 +117,93 @@ def main():
             game_choice = st.selectbox("🎮 Select Pokémon Game", game_options)
         with col2:
             is_final_evolution = st.checkbox("🧬 Only Final Evolutions", value=True)
+            one_per_family = st.checkbox("🌳 One Pokémon per Evolution Family", value=False)
+        search_budget = st.select_slider(
+            "🎯 Candidate Teams to Sample", options=SEARCH_BUDGETS, value=SEARCH_MAX_TEAMS,
+            format_func=lambda budget: f"{budget:,}"
+        )
 
-    filtered_df = pokemon_df.copy()
-    filtered_df["name"] = filtered_df["name"].apply(lambda x: x.title())
-
-    if game_choice:
-        filtered_df = filtered_df[filtered_df["games"].apply(lambda games: game_choice.lower() in [game.lower() for game in games])]
-
-    if is_final_evolution:
-        filtered_df = filtered_df[filtered_df["is_final_evolution"] == True]
-
-    if filtered_df.empty:
-        st.error("No Pokémon match your filter criteria. Please adjust the filters and try again.")
-        return
-
-    filtered_df["types_display"] = filtered_df["types"].apply(
-        lambda types: " | ".join(f"{TYPE_EMOJIS.get(t.lower(), '')} {t.title()}" for t in types)
-    )
-
-    filtered_df = filtered_df.sort_values(by="name")
-    # Prepend type icons to Pokémon names
-    filtered_df["display_name"] = filtered_df.apply(
-        lambda row: f"{' '.join(TYPE_EMOJIS.get(t.lower(), t.title()) for t in row['types'])} {'◯ ' if len(row['types']) == 1 else ''} {row['name']}",
-        axis=1
-    )
-    
+    with phase("filtering"):
+        # Views are built once per filter and shared; display columns are precomputed
+        view = dataset.view(game=game_choice, final_only=is_final_evolution)
 
-    # Create a mapping between display_name and name
-    display_name_to_name = dict(zip(filtered_df["display_name"], filtered_df["name"]))
+        if view.empty:
+            st.error("No Pokémon match your filter criteria. Please adjust the filters and try again.")
+            return
 
-    # Use the new display_name column for the dropdown
+    # Use the precomputed display_name labels for the dropdown
     locked_pokemon_display = st.multiselect(
         "🔍 Lock-in Pokémon (Optional)",
-        options=filtered_df["display_name"].tolist(),
+        options=view.options,
         default=st.session_state.get("locked_pokemon", []),  # Persist selection
         key="locked_pokemon"  # Bind to session state
     )
 
     # Extract the actual Pokémon names from the selected options using the mapping
-    locked_pokemon = [display_name_to_name[name] for name in locked_pokemon_display]
-    print(f"Locked Pokémon: {locked_pokemon}")  # Debugging
+    locked_pokemon = [dataset.display_to_name[name] for name in locked_pokemon_display]
+    logger.debug("Locked Pokémon: %s", locked_pokemon)
 
     if st.button("⚔️ Generate Optimal Teams"):
         st.subheader("Generating Top 5 Teams")
         progress_bar = st.progress(0)
         status_text = st.empty()
+        status_text.text(f"Evaluating up to {search_budget:,} candidate teams...")
+
+        # Identical queries from any session (or a prewarm_team_cache run) are served from
+        # the shared result cache; the key is the filtered pool in index order
+        try:
+            top_teams = cached_generate_top_team_candidates(
+                dataset.frame,
+                candidate_index=dataset.index,
+                candidate_filters=view.filters,
+                team_size=6,
+                top_n=5,
+                max_teams=search_budget,
+                locked_pokemon=locked_pokemon,
+                seed=SEARCH_SEED,
+                one_per_family=one_per_family,
+                progress_callback=progress_bar.progress,
+            )
+        except ValueError as e:
+            # Selections the search cannot satisfy, e.g. two locked members of one family
+            progress_bar.empty()
+            status_text.empty()
+            st.error(str(e))
+            return
 
-        # Simulate progress updates
-        for i in range(1, 6):
-            time.sleep(0.5)  # Simulate work
-            progress_bar.progress(i * 20)
-            status_text.text(f"Step {i}/5: Sorting through Pokémon...")
-
-        with st.spinner("Performing calculations...", show_time=True):
-            time.sleep(7)
+        status_text.empty()
+        progress_bar.progress(1.0)
         st.success("Calculations completed! Generating teams...")
+        cache_stats = TEAM_RESULT_CACHE.stats()
+        st.caption(f"Result cache: {cache_stats['hits'] + cache_stats['disk_hits']} hits, {cache_stats['misses']} misses")
 
-        # Call generate_top_team_candidates
-        top_teams = generate_top_team_candidates(
-            filtered_df,
-            team_size=6,
-            top_n=5,
-            max_teams=1000,
-            locked_pokemon=locked_pokemon
-        )
-
-        # Format the teams for display
-        formatted_teams = []
-        for team in top_teams:
-            # Convert the team (list of dictionaries) into a pandas DataFrame
-            formatted_team = pd.DataFrame(team).reset_index(drop=True)
-            formatted_teams.append(formatted_team)
+        with phase("formatting"):
+            # Format the teams for display
+            formatted_teams = []
+            for team in top_teams:
+                # Convert the team (list of dictionaries) into a pandas DataFrame
+                formatted_team = pd.DataFrame(team).reset_index(drop=True)
+                formatted_teams.append(formatted_team)
 
-        st.session_state.top_teams = formatted_teams
         st.session_state.teams_generated = True
         st.success("Teams generated successfully!")
 
         st.subheader("Team Synergy Scores")
         synergy_scores = [calculate_synergy_score(team) for team in formatted_teams]
-        visualize_synergy_scores(synergy_scores)
+        with phase("chart_rendering"):
+            # One parallel batch for every chart on the page; reruns hit the cache
+            chart_images = render_charts(
+                [synergy_scores_job(synergy_scores)]
+                + [radar_job(team, i, team_name=f"Team {i+1}") for i, team in enumerate(formatted_teams)]
+            )
+        st.image(chart_images[0])
 
         # Create tabs for each team
         tabs = st.tabs([f"Team {i+1}" for i in range(len(formatted_teams))])
         
-        for i, team in enumerate(st.session_state.top_teams):
+        for i, team in enumerate(formatted_teams):
             with tabs[i]:
                 st.subheader(f"Team {i+1} Pokémon:")
-                team["types_display"] = team["types"].apply(
-                    lambda types: " | ".join(f"{TYPE_EMOJIS.get(t.lower(), '')} {t.title()}" for t in types)
-                )
 
                 team_sorted = team.sort_values(by="total_stats", ascending=False)
 
@@ -216,16 +221,19 @@ def main():
 
                 covered_types, uncovered_types = evaluate_team_coverage(team)
 
-                def format_types_with_emojis(types):
-                    return [f"{TYPE_EMOJIS.get(t.lower(), '')} {t.title()}" for t in types]
-
-                covered_display = format_types_with_emojis(covered_types)
-                uncovered_display = format_types_with_emojis(uncovered_types)
+                covered_display = [format_types([t]) for t in covered_types]
+                uncovered_display = [format_types([t]) for t in uncovered_types]
                 visualize_team_composition(covered_display, uncovered_display)
 
+                with st.expander("🔁 Swap Suggestions (similar stats, different typing)"):
+                    swaps = suggest_swaps(team, dataset.frame, dataset.stat_index, dataset.index, view.filters)
+                    st.dataframe(pd.DataFrame({
+                        "Pokémon": list(swaps),
+                        "Alternatives": [", ".join(name for name, _ in options) for options in swaps.values()],
+                    }))
+
                 st.subheader(f"Team {i+1} Stats")
-                fig = plot_team_radar_chart(team, i, team_name=f"Team {i+1}")
-                st.pyplot(fig)
+                st.image(chart_images[i + 1])
 
     elif st.session_state.teams_generated:
         st.session_state.teams_generated = False